@@ -1,24 +1,40 @@
 #!/usr/bin/python
 """djLint · lint and reformat HTML templates."""
 
-import os
 import sys
-import tempfile
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from functools import partial
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 import click
-from click import echo
-from colorama import Fore, Style, colorama_text
-from tqdm import tqdm
+from colorama import colorama_text
 
-from .lint import lint_file
-from .output import print_output
-from .reformat import reformat_file
-from .settings import Config
-from .src import get_src
+from .runner import build_chunks, build_config, run
+
+
+def start_daemon(ctx: click.Context, _: click.Parameter, value: bool) -> None:
+    """Run the daemon instead of checking files."""
+    if not value or ctx.resilient_parsing:
+        return
+
+    if sys.platform == "win32":
+        raise click.UsageError("--daemon needs unix sockets, which Windows lacks.")
+
+    # the daemon needs unix sockets, so is only imported when used.
+    # pylint: disable=C0415
+    from .daemon import serve
+
+    serve(ctx.command)
+    ctx.exit()
+
+
+def start_lsp(ctx: click.Context, _: click.Parameter, value: bool) -> None:
+    """Run the language server instead of checking files."""
+    if not value or ctx.resilient_parsing:
+        return
+
+    # pylint: disable=C0415
+    from .lsp import serve
+
+    ctx.exit(serve())
 
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
@@ -37,7 +53,7 @@ from .src import get_src
     "--extension",
     type=str,
     default="",
-    help="File extension to check [default: html]",
+    help="File extensions to check, comma separated. [default: html]",
     show_default=False,
 )
 @click.option(
@@ -127,6 +143,54 @@ from .src import get_src
     is_flag=True,
     help="Count the number of occurrences of each error/warning code.",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Do not use cached results from previous runs.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of worker processes. [default: number of cpus]",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Print results as each file is done.",
+)
+@click.option(
+    "--stream-in-order",
+    is_flag=True,
+    help="Print results as each file is done, in file name order.",
+)
+@click.option(
+    "--changed-since",
+    type=str,
+    metavar="REV",
+    help="Only check files changed in git since a revision.",
+)
+@click.option(
+    "--staged",
+    is_flag=True,
+    help="Only check files staged in git.",
+)
+@click.option(
+    "--daemon",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=start_daemon,
+    help="Run as a daemon for djlint-client, keeping settings loaded between runs.",
+)
+@click.option(
+    "--lsp",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=start_lsp,
+    help="Run as a language server on stdin and stdout.",
+)
 @colorama_text(autoreset=True)
 def main(
     src: List[str],
@@ -147,19 +211,25 @@ def main(
     format_js: bool,
     configuration: Optional[str],
     statistics: bool,
+    no_cache: bool,
+    jobs: Optional[int],
+    stream: bool,
+    stream_in_order: bool,
+    changed_since: Optional[str],
+    staged: bool,
 ) -> None:
     """djLint · HTML template linter and formatter."""
-    config = Config(
-        src[0],
+    config = build_config(
+        src,
         extension=extension,
         ignore=ignore,
+        reformat=reformat,
         indent=indent,
+        check=check,
         quiet=quiet,
         profile=profile,
         require_pragma=require_pragma,
-        lint=lint or not (reformat or check),
-        reformat=reformat,
-        check=check,
+        lint=lint,
         use_gitignore=use_gitignore,
         warn=warn,
         preserve_leading_space=preserve_leading_space,
@@ -168,138 +238,13 @@ def main(
         format_js=format_js,
         configuration=configuration,
         statistics=statistics,
+        no_cache=no_cache,
+        jobs=jobs,
+        stream=stream,
+        stream_in_order=stream_in_order,
+        changed_since=changed_since,
+        staged=staged,
     )
 
-    temp_file = None
-
-    if "-" in src:
-        if config.files:
-            file_list = get_src([Path(x) for x in config.files], config)
-
-        else:
-            stdin_stream = click.get_text_stream("stdin", encoding="utf8")
-            stdin_text = stdin_stream.read()
-
-            temp_file = tempfile.NamedTemporaryFile(delete=False)
-            temp_file.write(str.encode(stdin_text))
-            temp_file.seek(0)
-
-            # cannot use gitignore for stdin paths.
-            config.use_gitignore = False
-
-            file_list = get_src([Path(temp_file.name)], config)
-
-    else:
-        file_list = get_src([Path(x) for x in src], config)
-
-    if len(file_list) == 0:
-        return
-
-    message = ""
-
-    if config.check is True:
-        message = "Checking"
-    elif config.reformat is True:
-        message = "Reformatting"
-
-    if config.lint:
-        if message != "":
-            message += " and "
-        message += "Linting"
-
-    # pylint: disable=C0209
-    bar_message = (
-        "{}{}{} {}{{n_fmt}}/{{total_fmt}}{} {}files{} {{bar}} {}{{elapsed}}{}".format(
-            Fore.BLUE + Style.BRIGHT,
-            message,
-            Style.RESET_ALL,
-            Fore.RED + Style.BRIGHT,
-            Style.RESET_ALL,
-            Fore.BLUE + Style.BRIGHT,
-            Style.RESET_ALL,
-            Fore.GREEN + Style.BRIGHT,
-            Style.RESET_ALL + "    ",
-        )
-    )
-    if config.stdin is False and config.quiet is False:
-        echo()
-
-    worker_count = os.cpu_count() or 1
-
-    progress_char = "┈━"
-
-    if sys.platform == "win32":
-        # Work around https://bugs.python.org/issue26903
-        worker_count = min(worker_count, 60)
-        progress_char = " »"
-
-    with ProcessPoolExecutor(max_workers=worker_count) as exe:
-        file_errors = []
-
-        func = partial(process, config)
-        futures = {exe.submit(func, this_file): this_file for this_file in file_list}
-
-        if temp_file is None:
-            elapsed = "00:00"
-            with tqdm(
-                total=len(file_list),
-                bar_format=bar_message,
-                colour="BLUE",
-                ascii=progress_char,
-                leave=False,
-            ) as pbar:
-
-                for future in as_completed(futures):
-
-                    file_errors.append(future.result())
-                    pbar.update()
-                    elapsed = pbar.format_interval(pbar.format_dict["elapsed"])
-
-            finished_bar_message = "{}{}{} {}{{n_fmt}}/{{total_fmt}}{} {}files{} {{bar}} {}{}{}    ".format(
-                Fore.BLUE + Style.BRIGHT,
-                message,
-                Style.RESET_ALL,
-                Fore.GREEN + Style.BRIGHT,
-                Style.RESET_ALL,
-                Fore.BLUE + Style.BRIGHT,
-                Style.RESET_ALL,
-                Fore.GREEN + Style.BRIGHT,
-                elapsed,
-                Style.RESET_ALL,
-            )
-
-            finished_bar = tqdm(
-                total=len(file_list),
-                initial=len(file_list),
-                bar_format=finished_bar_message,
-                colour="GREEN",
-                ascii=progress_char,
-                leave=True,
-            )
-            finished_bar.close()
-        else:
-            for future in as_completed(futures):
-                file_errors.append(future.result())
-
-    if temp_file and (config.reformat or config.check):
-        # if using stdin, only give back formatted code.
-        echo(Path(temp_file.name).read_text(encoding="utf8").rstrip().encode("utf8"))
-
-    if temp_file:
-        temp_file.close()
-        os.unlink(temp_file.name)
-
-    if bool(print_output(config, file_errors, len(file_list))) and config.warn is False:
+    if run(config, src) and config.warn is False:
         sys.exit(1)
-
-
-def process(config: Config, this_file: Path) -> Dict:
-    """Run linter or formatter."""
-    output = {}
-    if config.reformat or config.check:
-        output["format_message"] = reformat_file(config, this_file)
-
-    if config.lint:
-        output["lint_message"] = lint_file(config, this_file)
-
-    return output
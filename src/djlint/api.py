@@ -0,0 +1,75 @@
+"""Lint and format html text without reading or writing files.
+
+For use when djLint is run from Python::
+
+    from djlint.api import format_text, lint_text
+    from djlint.settings import Config
+
+    config = Config("templates/", profile="django")
+
+    for error in lint_text("<div></span>", config):
+        print(error.code, error.line, error.col, error.message)
+
+    result = format_text("<div><p>text</p></div>", config)
+    print(result.formatted)
+
+The Config is built once and reused, as building it loads the settings
+and rules. lint_file and reformat_file use the same lint_html and
+format_html code.
+"""
+import difflib
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Union
+
+from .lint import LintError, lint_html
+from .reformat import format_html
+from .settings import Config
+from .src import has_pragma
+
+
+class FormatResult(NamedTuple):
+    """The result of formatting a block of html."""
+
+    text: str
+    formatted: str
+
+    @property
+    def changed(self) -> bool:
+        """Check if formatting changed the text."""
+        return self.formatted != self.text
+
+    @property
+    def diff(self) -> List[str]:
+        """Get a unified diff from the text to the formatted text."""
+        return list(
+            difflib.unified_diff(self.text.splitlines(), self.formatted.splitlines())
+        )
+
+
+def lint_text(
+    text: str, config: Config, path: Optional[Union[str, Path]] = None
+) -> List[LintError]:
+    """Check html text for errors.
+
+    Errors are given in the order they are found in the text. path is
+    used for per file ignores. Text without a pragma is not checked when
+    the config requires one.
+    """
+    if config.require_pragma and not has_pragma(config, text):
+        return []
+
+    return sorted(
+        lint_html(config, text, Path(path) if path is not None else None),
+        key=lambda x: (x.line, x.col),
+    )
+
+
+def format_text(text: str, config: Config) -> FormatResult:
+    """Format html text.
+
+    Text without a pragma is left unchanged when the config requires one.
+    """
+    if config.require_pragma and not has_pragma(config, text):
+        return FormatResult(text, text)
+
+    return FormatResult(text, format_html(config, text))
@@ -0,0 +1,184 @@
+"""Cache lint and format results between runs.
+
+Each result is stored in its own file, keyed on the path and contents of
+the checked file plus a fingerprint of the djLint code, the versions of
+the libraries it uses, and every setting that changes the output.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import suppress
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .settings import Config
+
+try:
+    from importlib import metadata
+except ImportError:  # pragma: no cover
+    # Running on pre-3.8 Python; use importlib-metadata package
+    import importlib_metadata as metadata  # type: ignore
+
+# settings that change which files are checked or how results are shown,
+# but not the results themselves.
+IGNORED_SETTINGS = {
+    "cache",
+    "cache_dir",
+    "changed_since",
+    "check",
+    "exclude",
+    "extensions",
+    "files",
+    "gitignore",
+    "jobs",
+    "lint",
+    "linter_output_format",
+    "patterns",
+    "project_root",
+    "quiet",
+    "reformat",
+    "require_pragma",
+    "staged",
+    "statistics",
+    "stdin",
+    "stream",
+    "stream_in_order",
+    "use_gitignore",
+    "warn",
+}
+
+# cache limits. Least recently used entries are removed first.
+MAX_CACHE_SIZE = 256 * 1024 * 1024
+MAX_CACHE_AGE = 30 * 24 * 60 * 60
+PRUNE_INTERVAL = 24 * 60 * 60
+
+# dependencies whose output is cached along with djLint's own.
+DEPENDENCIES = ("cssbeautifier", "jsbeautifier", "regex")
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint() -> str:
+    """Hash the djLint source, bundled rules and dependency versions."""
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+
+    for source in sorted([*package.rglob("*.py"), package / "rules.yaml"]):
+        digest.update(source.read_bytes())
+
+    for dependency in DEPENDENCIES:
+        try:
+            version = metadata.version(dependency)
+        except metadata.PackageNotFoundError:
+            version = ""
+        digest.update(f"{dependency}\0{version}\0".encode("utf8"))
+
+    return digest.hexdigest()
+
+
+def config_fingerprint(config: Config) -> str:
+    """Hash the settings that change lint or format results."""
+    settings = {
+        key: value for key, value in vars(config).items() if key not in IGNORED_SETTINGS
+    }
+
+    return hashlib.sha256(
+        (json.dumps(settings, sort_keys=True, default=str) + code_fingerprint()).encode(
+            "utf8"
+        )
+    ).hexdigest()
+
+
+class Cache:
+    """On-disk store of lint and format results."""
+
+    def __init__(self, config: Config) -> None:
+        """Use the cache folder of a Config."""
+        self.directory = config.cache_dir
+        self.fingerprint = config_fingerprint(config)
+
+    def _entry(self, kind: str, this_file: Path, text: str) -> Path:
+        digest = hashlib.sha256()
+        for part in (self.fingerprint, kind, str(this_file), text):
+            digest.update(part.encode("utf8"))
+            digest.update(b"\0")
+
+        key = digest.hexdigest()
+        return self.directory / key[:2] / key
+
+    def get(self, kind: str, this_file: Path, text: str) -> Optional[Dict]:
+        """Get a cached result, or None if there is no usable entry.
+
+        A used entry is touched so that prune removes the least recently
+        used entries first.
+        """
+        entry = self._entry(kind, this_file, text)
+        try:
+            result = json.loads(entry.read_text(encoding="utf8"))
+
+        except (OSError, ValueError):
+            return None
+
+        with suppress(OSError):
+            os.utime(entry)
+
+        return result
+
+    def store(self, kind: str, this_file: Path, text: str, result: Dict) -> None:
+        """Save a result.
+
+        The entry is written to a temp file first so that other workers
+        never read a partial entry. Failing to write is not an error.
+        """
+        entry = self._entry(kind, this_file, text)
+        with suppress(OSError):
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=entry.parent, delete=False, encoding="utf8"
+            ) as temp_file:
+                json.dump(result, temp_file)
+            os.replace(temp_file.name, entry)
+
+    def prune(self) -> None:
+        """Remove old entries and keep the cache under its size limit.
+
+        Walking the cache is not free, so this runs at most once per
+        PRUNE_INTERVAL.
+        """
+        marker = self.directory / ".pruned"
+        now = time.time()
+
+        with suppress(OSError):
+            if now - marker.stat().st_mtime < PRUNE_INTERVAL:
+                return
+
+        entries: List[Tuple[float, int, Path]] = []
+        # parsed rules files are kept beside the results, see read_rules.
+        for entry in [
+            *self.directory.glob("*/*"),
+            *self.directory.glob("rules-*.json"),
+        ]:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort(key=lambda x: x[0])
+        total_size = sum(size for _, size, _ in entries)
+
+        for modified, size, entry in entries:
+            if now - modified < MAX_CACHE_AGE and total_size <= MAX_CACHE_SIZE:
+                break
+
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total_size -= size
+
+        with suppress(OSError):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            marker.touch()
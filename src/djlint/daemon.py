@@ -0,0 +1,251 @@
+"""Run djLint as a daemon.
+
+The daemon listens on a local unix socket. djlint-client sends it the
+arguments, working folder and stdin of a run, and gets back the output
+and exit code. Settings, rules and compiled patterns stay loaded
+between runs, so a run only pays for the files it checks.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import click
+
+from .runner import build_config, run
+from .settings import Config, find_project_root, settings_stamps
+
+# the most Configs kept loaded. Each set of options and settings files
+# used by a client needs its own.
+MAX_CONFIGS = 32
+
+
+def socket_path() -> Path:
+    """Get the path of the daemon socket.
+
+    DJLINT_SOCKET takes precedence, then the user runtime folder.
+    djlint_client.socket_path must give the same path.
+    """
+    if os.environ.get("DJLINT_SOCKET"):
+        return Path(os.environ["DJLINT_SOCKET"])
+
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "djlint.sock"
+
+    return Path(tempfile.gettempdir()) / f"djlint-{os.getuid()}" / "djlint.sock"
+
+
+def is_private(folder: Path) -> bool:
+    """Check that a folder is owned by the user and closed to everyone else.
+
+    djlint_client.is_private must do the same check.
+    """
+    try:
+        info = folder.lstat()
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and stat.S_IMODE(info.st_mode) == 0o700
+    )
+
+
+class Output(io.TextIOWrapper):
+    """Captured output of a run, that is a tty if the client's is.
+
+    Output is written to bytes, as click writes bytes to the buffer of
+    a text stream.
+    """
+
+    def __init__(self, tty: bool) -> None:
+        """Start with no output."""
+        self.output = io.BytesIO()
+        super().__init__(self.output, encoding="utf8", write_through=True)
+        self.tty = tty
+
+    def isatty(self) -> bool:
+        """Check if the client's output is a tty."""
+        return self.tty
+
+    def text(self) -> str:
+        """Get everything written so far."""
+        self.flush()
+        return self.output.getvalue().decode("utf8")
+
+
+class Configs:
+    """Configs kept loaded between runs.
+
+    A Config is reused by runs in the same project with the same options,
+    whatever files they check, while the settings files it was built from
+    are unchanged.
+    """
+
+    def __init__(self) -> None:
+        """Start with no Configs loaded."""
+        self.configs: Dict[str, Config] = {}
+
+    def key(self, params: Dict[str, Any]) -> str:
+        """Get the project root, options and settings files of a run."""
+        src = params["src"][0]
+        root = find_project_root(Path.cwd() if src == "-" else Path(src))
+        options = {key: value for key, value in params.items() if key != "src"}
+        configuration = options["configuration"]
+
+        # relative paths only point to the same files from the same folder.
+        relative = not root.is_absolute() or (
+            configuration and not Path(configuration).is_absolute()
+        )
+
+        return json.dumps(
+            [
+                os.getcwd() if relative else None,
+                str(root),
+                # reading stdin changes how results are printed.
+                "-" in src,
+                options,
+                settings_stamps(root, configuration),
+            ],
+            sort_keys=True,
+            default=str,
+        )
+
+    def get(self, params: Dict[str, Any]) -> Config:
+        """Get a Config for a run's options."""
+        key = self.key(params)
+
+        if key not in self.configs:
+            if len(self.configs) >= MAX_CONFIGS:
+                # drop the oldest
+                del self.configs[next(iter(self.configs))]
+
+            self.configs[key] = build_config(**params)
+
+        return self.configs[key]
+
+
+def handle_request(
+    request: Dict[str, Any], configs: Configs, command: click.Command
+) -> Dict[str, Any]:
+    """Run djLint for a client request.
+
+    command is the djlint command, used to read the args. The request has the args, cwd and (when reading from "-") stdin of
+    the run, and if the client's stdout is a tty. The response has the
+    stdout, stderr and exit code of the run.
+    """
+    stdout = Output(request.get("tty", False))
+    stderr = Output(request.get("tty", False))
+    stdin = io.TextIOWrapper(
+        io.BytesIO(request.get("stdin", "").encode("utf8")), encoding="utf8"
+    )
+    old_stdin = sys.stdin
+    old_cwd = os.getcwd()
+    exit_code: Any = 0
+
+    try:
+        os.chdir(request["cwd"])
+        sys.stdin = stdin
+
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                if "--daemon" in request["args"]:
+                    raise click.UsageError("The daemon is already running.")
+
+                with command.make_context("djlint", list(request["args"])) as ctx:
+                    params = ctx.params
+
+                config = configs.get(params)
+
+                if run(config, params["src"]) and config.warn is False:
+                    exit_code = 1
+
+            except click.exceptions.Exit as error:
+                exit_code = error.exit_code
+
+            except click.ClickException as error:
+                error.show()
+                exit_code = error.exit_code
+
+            except SystemExit as error:
+                exit_code = 0 if error.code is None else error.code
+
+            # pylint: disable=W0703
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+
+    finally:
+        sys.stdin = old_stdin
+        os.chdir(old_cwd)
+
+    return {
+        "stdout": stdout.text(),
+        "stderr": stderr.text(),
+        "exit_code": exit_code if isinstance(exit_code, int) else 1,
+    }
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Read one json request from the socket and write back the response."""
+
+    server: "Server"
+
+    def handle(self) -> None:
+        """Run the request and send the response."""
+        request = json.loads(self.rfile.readline())
+        response = handle_request(request, self.server.configs, self.server.command)
+        self.wfile.write(json.dumps(response).encode("utf8") + b"\n")
+
+
+class Server(socketserver.UnixStreamServer):
+    """Daemon server. Requests are handled one at a time."""
+
+    def __init__(self, path: Path, command: click.Command) -> None:
+        """Listen on a socket, running requests with the djlint command."""
+        self.configs = Configs()
+        self.command = command
+        super().__init__(str(path), RequestHandler)
+
+
+def serve(command: click.Command, path: Optional[Path] = None) -> None:
+    """Run the daemon until it is stopped."""
+    path = path or socket_path()
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    # anyone who can put a socket in the folder gets the arguments and
+    # stdin of every run.
+    if not is_private(path.parent):
+        raise click.UsageError(
+            f"{path.parent} must be a folder owned by you that only you can use."
+        )
+
+    # remove the socket of a daemon that did not shut down cleanly.
+    if path.exists():
+        with socket.socket(socket.AF_UNIX) as client:
+            try:
+                client.connect(str(path))
+            except OSError:
+                path.unlink()
+            else:
+                raise click.UsageError(f"A daemon is already running on {path}.")
+
+    with Server(path, command) as server:
+        os.chmod(path, 0o600)
+        click.echo(f"djLint daemon listening on {path}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink()
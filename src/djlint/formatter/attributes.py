@@ -4,7 +4,7 @@ from functools import partial
 
 import regex as re
 
-from ..helpers import inside_ignored_block
+from ..helpers import IgnoredRegions
 from ..settings import Config
 
 
@@ -34,15 +34,11 @@ def format_template_tags(config: Config, attributes: str, spacing: int) -> str:
         for line_number, line in enumerate(attributes.splitlines()):
 
             # when checking for template tag, use "match" to force start of line check.
-            if re.match(
-                re.compile(config.template_unindent, re.I | re.X), line.strip()
-            ):
+            if config.patterns.template_unindent.match(line.strip()):
                 indent = indent - 1
                 tmp = (indent * config.indent) + (indent_adder * " ") + line.strip()
 
-            elif re.match(
-                re.compile(config.tag_unindent_line, re.I | re.X), line.strip()
-            ):
+            elif config.patterns.tag_unindent_line.match(line.strip()):
                 # if we are leaving an indented group, then remove the indent_adder
                 tmp = (
                     max(indent - 1, 0) * config.indent
@@ -50,11 +46,9 @@ def format_template_tags(config: Config, attributes: str, spacing: int) -> str:
                     + line.strip()
                 )
 
-            elif re.search(
-                re.compile(config.template_indent, re.I | re.X), line.strip()
-            ) and not re.search(
-                re.compile(config.template_unindent, re.I | re.X), line.strip()
-            ):
+            elif config.patterns.template_indent.search(
+                line.strip()
+            ) and not config.patterns.template_unindent.search(line.strip()):
                 # for open tags, search, but then check that they are not closed.
                 tmp = (indent * config.indent) + (indent_adder * " ") + line.strip()
                 indent = indent + 1
@@ -78,44 +72,27 @@ def format_template_tags(config: Config, attributes: str, spacing: int) -> str:
 
         return f"{match.group(1)}\n{match.group(2).strip()}"
 
-    break_char = config.break_before
-
     func = partial(add_break, "before")
 
-    attributes = re.sub(
-        re.compile(
-            break_char
-            + r".\K((?:{%|{{\#)[ ]*?(?:"
-            + config.break_template_tags
-            + ")[^}]+?[%|}]})",
-            flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE,
-        ),
-        func,
-        attributes,
+    attributes = config.patterns.attribute_break_template_tag_before.sub(
+        func, attributes
     )
 
     func = partial(add_break, "after")
     # break after
-    attributes = re.sub(
-        re.compile(
-            r"((?:{%|{{\#)[ ]*?(?:"
-            + config.break_template_tags
-            + ")[^}]+?[%|}]})([^\n]+)$",
-            flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE,
-        ),
-        func,
-        attributes,
+    attributes = config.patterns.attribute_break_template_tag_after.sub(
+        func, attributes
     )
     attributes = add_indentation(config, attributes, spacing)
 
     return attributes
 
 
-def format_attributes(config: Config, html: str, match: re.match) -> str:
+def format_attributes(config: Config, regions: IgnoredRegions, match: re.match) -> str:
     """Spread long attributes over multiple lines."""
     # check that we are not inside an ignored block
     if (
-        inside_ignored_block(config, html, match)
+        regions.inside_ignored_block(match)
         or len(match.group(3).strip()) < config.max_attribute_length
     ):
         return match.group()
@@ -129,9 +106,7 @@ def format_attributes(config: Config, html: str, match: re.match) -> str:
     attributes = []
 
     # format attributes as groups
-    for attr_grp in re.finditer(
-        config.attribute_pattern, match.group(3).strip(), re.VERBOSE
-    ):
+    for attr_grp in config.patterns.attribute_pattern.finditer(match.group(3).strip()):
 
         attrib_name = attr_grp.group(1)
         is_quoted = attr_grp.group(2) and attr_grp.group(2)[0] in ["'", '"']
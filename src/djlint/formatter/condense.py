@@ -5,84 +5,51 @@
 """
 
 from functools import partial
+from typing import Optional
 
 import regex as re
 
-from ..helpers import inside_ignored_block
+from ..helpers import IgnoredRegions, RegionsCache
 from ..settings import Config
 
 
-def condense_html(html: str, config: Config) -> str:
+def condense_html(
+    html: str, config: Config, regions_cache: Optional[RegionsCache] = None
+) -> str:
     """Compress back tags that do not need to be expanded."""
+    regions_cache = regions_cache or RegionsCache(config)
     # put empty tags on one line
 
-    def strip_space(config: Config, html: str, match: re.Match) -> str:
+    def strip_space(regions: IgnoredRegions, match: re.Match) -> str:
         """Trim leading whitespace."""
-        if inside_ignored_block(config, html, match):
+        if regions.inside_ignored_block(match):
             return match.group()
 
         return match.group(1)
 
-    func = partial(strip_space, config, html)
-
-    line_contents = r"(.*?)"
-    trailing_contents = r"\n \t"
-
-    if config.preserve_blank_lines:
-        line_contents = r"([^\n]+?)"
-        trailing_contents = r" \t"
+    func = partial(strip_space, regions_cache.get(html))
 
     if not config.preserve_leading_space:
         # remove any leading/trailing space
 
-        html = re.sub(
-            re.compile(rf"^[ \t]*{line_contents}[{trailing_contents}]*$", re.M),
-            func,
-            html,
-        )
+        html = config.patterns.leading_space.sub(func, html)
 
     else:
         # only remove leading space in front of tags
         # <, {%, {#, {{
-        html = re.sub(
-            re.compile(
-                rf"^[ \t]*((?:<|{{%|{{\#|{{{{).*?)[{trailing_contents}]*$", re.M
-            ),
-            func,
-            html,
-        )
-        html = re.sub(
-            re.compile(rf"^{line_contents}[{trailing_contents}]*$", re.M), func, html
-        )
+        html = config.patterns.leading_tag_space.sub(func, html)
+        html = config.patterns.trailing_space.sub(func, html)
 
     def if_blank_line_after_match(config: Config, html: str) -> bool:
         """Check if there should be a blank line after."""
         if config.blank_line_after_tag:
-            return not any(
-                re.findall(
-                    re.compile(
-                        rf"((?:{{%\s*?{tag}[^}}]+?%}}\n?)+)",
-                        re.IGNORECASE | re.MULTILINE | re.DOTALL,
-                    ),
-                    html,
-                )
-                for tag in [x.strip() for x in config.blank_line_after_tag.split(",")]
-            )
+            return not config.patterns.has_blank_line_after_tag.search(html)
         return True
 
     def if_blank_line_before_match(config: Config, html: str) -> bool:
         """Check if there should be a blank line before."""
         if config.blank_line_before_tag:
-            return not any(
-                re.findall(
-                    re.compile(
-                        rf"((?:{{%\s*?{tag}[^}}]+?%}}\n?)+)",
-                        re.IGNORECASE | re.MULTILINE | re.DOTALL,
-                    ),
-                    html,
-                )
-                for tag in [x.strip() for x in config.blank_line_before_tag.split(",")]
-            )
+            return not config.patterns.has_blank_line_before_tag.search(html)
         return True
 
     def condense_line(config: Config, match: re.Match) -> str:
@@ -99,74 +66,46 @@ def condense_html(html: str, config: Config) -> str:
 
         return match.group()
 
-    def add_blank_line_after(config: Config, html: str, match: re.Match) -> str:
+    def add_blank_line_after(regions: IgnoredRegions, match: re.Match) -> str:
         """Add break after if not in ignored block."""
-        if inside_ignored_block(config, html, match):
+        if regions.inside_ignored_block(match):
             return match.group()
 
         # check that next line is not blank.
-        if html[match.end() : match.end() + 1] != "\n":  # noqa:E203
+        if regions.html[match.end() : match.end() + 1] != "\n":  # noqa:E203
             return match.group() + "\n"
 
         return match.group()
 
-    func = partial(add_blank_line_after, config, html)
+    func = partial(add_blank_line_after, regions_cache.get(html))
 
     # should we add blank lines after load tags?
     if config.blank_line_after_tag:
-        for tag in [x.strip() for x in config.blank_line_after_tag.split(",")]:
-            html = re.sub(
-                re.compile(
-                    rf"((?:{{%\s*?{tag}\b[^}}]+?%}}\n?)+)",
-                    re.IGNORECASE | re.MULTILINE | re.DOTALL,
-                ),
-                func,
-                html,
-            )
+        html = config.patterns.blank_line_after_tags.sub(func, html)
 
-    def add_blank_line_before(config: Config, html: str, match: re.Match) -> str:
+    def add_blank_line_before(regions: IgnoredRegions, match: re.Match) -> str:
         """Add break before if not in ignored block and not first line in file."""
-        if inside_ignored_block(config, html, match) or match.start() == 0:
+        if regions.inside_ignored_block(match) or match.start() == 0:
             return match.group()
 
         return "\n" + match.group()
 
-    func = partial(add_blank_line_before, config, html)
+    func = partial(add_blank_line_before, regions_cache.get(html))
 
     # should we add blank lines before load tags?
     if config.blank_line_before_tag:
-        for tag in [x.strip() for x in config.blank_line_before_tag.split(",")]:
-
-            html = re.sub(
-                re.compile(
-                    rf"(?<!^\n)((?:{{%\s*?{tag}\b[^}}]+?%}}\n?)+)",
-                    re.IGNORECASE | re.MULTILINE | re.DOTALL,
-                ),
-                func,
-                html,
-            )
+        html = config.patterns.blank_line_before_tags.sub(func, html)
 
     func = partial(condense_line, config)
 
     # put short single line tags on one line
-    html = re.sub(
-        re.compile(
-            rf"(<({config.optional_single_line_html_tags})\b(?:\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])*>)\s*([^<\n]*?)\s*?(</(\2)>)",
-            re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE,
-        ),
+    html = config.patterns.single_line_html_tag.sub(
         func,
         html,
         re.IGNORECASE | re.MULTILINE | re.DOTALL,
     )
 
     # put short template tags back on one line
-    html = re.sub(
-        re.compile(
-            rf"({{%-?[ ]*?({config.optional_single_line_template_tags})[^\n(?:%}})]*?%}})\s*?([ ]*?[^%\n]*?[ ]*?)\s*?({{%-?[ ]+?end(\2)[ ]*?%}})",
-            flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE,
-        ),
-        func,
-        html,
-    )
+    html = config.patterns.single_line_template_tag.sub(func, html)
 
     return html
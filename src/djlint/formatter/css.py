@@ -1,5 +1,6 @@
 """djLint function to call cssbeautifier."""
 from functools import partial
+from typing import List
 
 import cssbeautifier
 import regex as re
@@ -21,7 +22,7 @@ def format_css(html: str, config: Config) -> str:
         opts = BeautifierOptions(config.css_config)
 
         beautified_lines = cssbeautifier.beautify(match.group(3), opts).splitlines()
-        beautified = ""
+        beautified: List[str] = []
 
         # add indent back
         ignore_indent = False
@@ -39,9 +40,9 @@ def format_css(html: str, config: Config) -> str:
 
             if ignore_indent is False and line:
 
-                beautified += "\n" + inner_indent + line
+                beautified.append("\n" + inner_indent + line)
             else:
-                beautified += "\n" + line
+                beautified.append("\n" + line)
 
             if re.search(
                 re.compile(
@@ -52,7 +53,7 @@ def format_css(html: str, config: Config) -> str:
             ):
                 ignore_indent = True
 
-        return match.group(1) + match.group(2) + beautified + "\n" + indent
+        return match.group(1) + match.group(2) + "".join(beautified) + "\n" + indent
 
     func = partial(launch_formatter, config)
 
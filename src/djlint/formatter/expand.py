@@ -5,27 +5,89 @@
 """
 
 from functools import partial
+from typing import Dict, Optional, Set
 
 import regex as re
 
-from ..helpers import inside_ignored_block, inside_template_block
+from ..helpers import IgnoredRegions, RegionsCache
 from ..settings import Config
 
+# closing character of each template token, by the character after its "{".
+TEMPLATE_TOKEN_CLOSE = {"{": "}", "%": "%", "#": "#"}
 
-def expand_html(html: str, config: Config) -> str:
+
+def template_token_end(html: str, start: int) -> Optional[int]:
+    """Get the end of a {{ }}, {% %} or {# #} token inside an html tag.
+
+    The token ends at the first closing character, as in "{%[^%]*%}".
+    """
+    close = TEMPLATE_TOKEN_CLOSE.get(html[start + 1 : start + 2])  # noqa:E203
+    if close is None:
+        return None
+
+    index = html.find(close, start + 2)
+    if index == -1 or html[index + 1 : index + 2] != "}":  # noqa:E203
+        return None
+
+    return index + 2
+
+
+def template_tags_in_html_tags(config: Config, html: str) -> Set[int]:
+    """Find the template tags that are inside an html tag.
+
+    Gives the offset of each "{" that can be reached from an html tag
+    opening through its attributes. Attributes end at a ">", "{" or "}",
+    unless it is part of a quoted value or template tag.
+    """
+    inside: Set[int] = set()
+    # offsets where a quoted value or template tag inside an html tag ends.
+    token_ends: Set[int] = set()
+    # if the last quote of each kind was inside an html tag.
+    open_quotes: Dict[str, bool] = {'"': False, "'": False}
+    in_tag = False
+
+    for bound in config.patterns.html_tag_attribute_bounds.finditer(html):
+        char = bound.group()
+
+        if char[0] == "<":
+            in_tag = True
+
+        elif char in open_quotes:
+            if open_quotes[char]:
+                token_ends.add(bound.end())
+            open_quotes[char] = in_tag
+
+        else:
+            if char == "{" and in_tag:
+                inside.add(bound.start())
+                end = template_token_end(html, bound.start())
+                if end is not None:
+                    token_ends.add(end)
+            in_tag = False
+
+        if bound.end() in token_ends:
+            in_tag = True
+
+    return inside
+
+
+def expand_html(
+    html: str, config: Config, regions_cache: Optional[RegionsCache] = None
+) -> str:
     """Split single line html into many lines based on tags."""
+    regions_cache = regions_cache or RegionsCache(config)
 
-    def add_html_line(out_format: str, match: re.Match) -> str:
+    def add_html_line(out_format: str, regions: IgnoredRegions, match: re.Match) -> str:
         """Add whitespace.
 
         Do not add whitespace if the tag is in a non indent block.
 
         Do not add whiatespace if the tag is a in a template block
         """
-        if inside_ignored_block(config, html, match):
+        if regions.inside_ignored_block(match):
             return match.group(1)
 
-        if inside_template_block(config, html, match):
+        if regions.inside_template_block(match):
             return match.group(1)
 
         if out_format == "\n%s" and match.start() == 0:
@@ -33,49 +95,28 @@ def expand_html(html: str, config: Config) -> str:
 
         return out_format % match.group(1)
 
-    html_tags = config.break_html_tags
-
-    add_left = partial(add_html_line, "\n%s")
-    add_right = partial(add_html_line, "%s\n")
-
-    break_char = config.break_before
-
     # html tags - break before
-    html = re.sub(
-        re.compile(
-            rf"{break_char}\K(</?(?:{html_tags})\b(\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])*>)",
-            flags=re.IGNORECASE | re.VERBOSE,
-        ),
-        add_left,
-        html,
+    html = config.patterns.break_html_tag_before.sub(
+        partial(add_html_line, "\n%s", regions_cache.get(html)), html
     )
 
     # html tags - break after
-    html = re.sub(
-        re.compile(
-            rf"(</?(?:{html_tags})\b(\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])*>)(?!\s*?\n)(?=[^\n])",
-            flags=re.IGNORECASE | re.VERBOSE,
-        ),
-        add_right,
-        html,
+    html = config.patterns.break_html_tag_after.sub(
+        partial(add_html_line, "%s\n", regions_cache.get(html)), html
     )
 
     # template tag breaks
-    def should_i_move_template_tag(out_format: str, match: re.Match) -> str:
+    def should_i_move_template_tag(
+        out_format: str,
+        regions: IgnoredRegions,
+        in_html_tags: Set[int],
+        match: re.Match,
+    ) -> str:
         # ensure template tag is not inside an html tag and also not the first line of the file
 
-        if inside_ignored_block(config, html, match):
+        if regions.inside_ignored_block(match):
             return match.group(1)
-        if not re.findall(
-            r"\<(?:"
-            + str(config.indent_html_tags)
-            + r")\b(?:\"[^\"]*\"|'[^']*'|{{[^}]*}}|{%[^%]*%}|{\#[^\#]*\#}|[^>{}])*?"
-            # original
-            # + r")\b(?:[^>]|{%[^(?:%}]*?%}|{{[^(?:}}]*?}})*?"
-            + re.escape(match.group(1)) + "$",
-            html[: match.end()],
-            re.MULTILINE | re.VERBOSE,
-        ):
+        if match.start(1) not in in_html_tags:
             if out_format == "\n%s" and match.start() == 0:
                 return match.group(1)
             return out_format % match.group(1)
@@ -84,27 +125,24 @@ def expand_html(html: str, config: Config) -> str:
 
     # template tags
     # break before
-    html = re.sub(
-        re.compile(
-            break_char
-            + r"\K((?:{%|{{\#)[ ]*?(?:"
-            + config.break_template_tags
-            + ")[^}]+?[%|}]})",
-            flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+    html = config.patterns.break_template_tag_before.sub(
+        partial(
+            should_i_move_template_tag,
+            "\n%s",
+            regions_cache.get(html),
+            template_tags_in_html_tags(config, html),
         ),
-        partial(should_i_move_template_tag, "\n%s"),
         html,
     )
 
     # break after
-    html = re.sub(
-        re.compile(
-            r"((?:{%|{{\#)[ ]*?(?:"
-            + config.break_template_tags
-            + ")[^}]+?[%|}]})(?=[^\n])",
-            flags=re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+    html = config.patterns.break_template_tag_after.sub(
+        partial(
+            should_i_move_template_tag,
+            "%s\n",
+            regions_cache.get(html),
+            template_tags_in_html_tags(config, html),
         ),
-        partial(should_i_move_template_tag, "%s\n"),
         html,
     )
 
@@ -1,11 +1,13 @@
 """djLint add indentation to html."""
 
 from functools import partial
+from typing import List, Optional
 
 import regex as re
 
 from ..helpers import (
-    inside_ignored_block,
+    IgnoredRegions,
+    RegionsCache,
     is_ignored_block_closing,
     is_ignored_block_opening,
     is_safe_closing_tag,
@@ -13,167 +15,124 @@ from ..helpers import (
 from ..settings import Config
 from .attributes import format_attributes
 
+# line classes, see classify_line.
+INLINE = "inline"
+UNINDENT = "unindent"
+UNINDENT_AFTER = "unindent after"
+UNINDENT_LINE = "unindent line"
+INDENT = "indent"
+TEXT = "text"
+
+
+def has_tag(item: str) -> bool:
+    """Check if a line could hold an html or template tag."""
+    return "<" in item or "{" in item
+
+
+def classify_line(config: Config, item: str, safe_closing: bool) -> str:
+    """Find how a line outside of an ignored block changes the indent.
+
+    The tag patterns are only run on lines that could hold a tag.
+    """
+    if not has_tag(item):
+        return TEXT
+
+    patterns = config.patterns
+    line_class = TEXT
+
+    # if a one-line, inline tag, just process it, only if line starts w/ it
+    # or if it is trailing text
+    if patterns.ignored_inline_line.search(item) or patterns.single_line_tags.search(
+        item
+    ):
+        line_class = INLINE
+
+    # if unindent, move left
+    elif (
+        patterns.tag_unindent.search(item)
+        and not safe_closing
+        # and not ending in a slt like <span><strong></strong>.
+        and not patterns.ends_with_single_line_tag.search(item)
+        and not patterns.ends_with_single_line_tag_attributes.search(item)
+    ):
+        # block to catch inline block followed by a non-break tag
+        if patterns.starts_with_single_line_tag.search(
+            item
+        ) or patterns.starts_with_single_line_tag_attributes.search(item):
+            line_class = UNINDENT_AFTER
+        else:
+            line_class = UNINDENT
+
+    elif patterns.tag_unindent_line_start.search(item):
+        line_class = UNINDENT_LINE
+
+    # if indent, move right
+    elif patterns.tag_indent_line_start.search(item):
+        line_class = INDENT
+
+    return line_class
+
 
-def indent_html(rawcode: str, config: Config) -> str:
+def indent_html(
+    rawcode: str, config: Config, regions_cache: Optional[RegionsCache] = None
+) -> str:
     """Indent raw code."""
+    regions_cache = regions_cache or RegionsCache(config)
     rawcode_flat_list = re.split("\n", rawcode)
 
     indent = config.indent
 
-    beautified_code = ""
+    beautified_lines: List[str] = []
     indent_level = 0
     is_raw_first_line = False
     is_block_raw = False
 
-    slt_html = config.indent_html_tags
-
-    # here using all tags cause we allow empty tags on one line
-    always_self_closing_html = config.always_self_closing_html_tags
-
-    # here using all tags cause we allow empty tags on one line
-    slt_template = config.optional_single_line_template_tags
-
     # nested ignored blocks..
     ignored_level = 0
 
     for item in rawcode_flat_list:
+        is_opening = has_tag(item) and is_ignored_block_opening(config, item)
+        is_safe_closing = has_tag(item) and bool(is_safe_closing_tag(config, item))
 
-        # if a raw tag first line
-        if not is_block_raw and is_ignored_block_opening(config, item):
-            is_raw_first_line = True
+        if is_opening:
+            # if a raw tag first line
+            if not is_block_raw:
+                is_raw_first_line = True
 
-        # if a raw tag then start ignoring
-        if is_ignored_block_opening(config, item):
+            # if a raw tag then start ignoring
             is_block_raw = True
             ignored_level += 1
 
-        if is_safe_closing_tag(config, item):
+        if is_safe_closing:
             ignored_level -= 1
             ignored_level = max(ignored_level, 0)
             if is_block_raw is True and ignored_level == 0:
                 is_block_raw = False
 
-        if (
-            re.findall(
-                rf"^\s*?(?:{config.ignored_inline_blocks})",
-                item,
-                flags=re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-            )
-            and is_block_raw is False
-        ):
-            tmp = (indent * indent_level) + item + "\n"
+        line_class = (
+            TEXT if is_block_raw else classify_line(config, item, is_safe_closing)
+        )
 
-        # if a one-line, inline tag, just process it, only if line starts w/ it
-        # or if it is trailing text
+        if line_class == INLINE:
+            tmp = (indent * indent_level) + item + "\n"
 
-        elif (
-            (
-                re.findall(
-                    re.compile(
-                        rf"""^(?:[^<\s].*?)? # start of a line, optionally with some text
-                    (?:
-                        (?:<({slt_html})>)(?:.*?)(?:</(?:\1)>) # <span>stuff</span> >>>> match 1
-                       |(?:<({slt_html})\b[^>]+?>)(?:.*?)(?:</(?:\2)>) # <span stuff>stuff</span> >>> match 2
-                       |(?:<(?:{always_self_closing_html})\b[^>]*?/?>) # <img stuff />
-                       |(?:<(?:{slt_html})\b[^>]*?/>) # <img />
-                       |(?:{{%[ ]*?({slt_template})[ ]+?.*?%}})(?:.*?)(?:{{%[ ]+?end(?:\3)[ ]+?.*?%}}) # >>> match 3
-                       |{config.ignored_inline_blocks}
-                    )[ \t]*?
-                    (?:
-                    .*? # anything
-                    (?: # followed by another slt
-                        (?:<({slt_html})>)(?:.*?)(?:</(?:\4)>) # <span>stuff</span> >>>> match 1
-                       |(?:<({slt_html})\b[^>]+?>)(?:.*?)(?:</(?:\5)>) # <span stuff>stuff</span> >>> match 2
-                       |(?:<(?:{always_self_closing_html})\b[^>]*?/?>) # <img stuff />
-                       |(?:<(?:{slt_html})\b[^>]*?/>) # <img />
-                       |(?:{{%[ ]*?({slt_template})[ ]+?.*?%}})(?:.*?)(?:{{%[ ]+?end(?:\6)[ ]+?.*?%}}) # >>> match 3
-                       |{config.ignored_inline_blocks}
-                    )[ \t]*?
-                    )*? # optional of course
-                    [^<]*?$ # with no other tags following until end of line
-                """,
-                        re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-                    ),
-                    item,
-                )
-            )
-            and is_block_raw is False
-        ):
+        elif line_class == UNINDENT_AFTER:
+            # unindent after instead of before
             tmp = (indent * indent_level) + item + "\n"
+            indent_level = max(indent_level - 1, 0)
 
-        # if unindent, move left
-        elif (
-            re.search(
-                config.tag_unindent,
-                item,
-                re.IGNORECASE | re.MULTILINE | re.VERBOSE,
-            )
-            and is_block_raw is False
-            and not is_safe_closing_tag(config, item)
-            # and not ending in a slt like <span><strong></strong>.
-            and not re.findall(
-                rf"(<({slt_html})>)(.*?)(</(\2)>[^<]*?$)",
-                item,
-                re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-            )
-            and not re.findall(
-                rf"(<({slt_html})\\b[^>]+?>)(.*?)(</(\2)>[^<]*?$)",
-                item,
-                re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-            )
-        ):
-            # block to catch inline block followed by a non-break tag
-            if (
-                len(
-                    re.findall(
-                        rf"(^<({slt_html})>)(.*?)(</(\2)>)",
-                        item,
-                        re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-                    )
-                    or re.findall(
-                        re.compile(
-                            rf"(^<({slt_html})\b[^>]+?>)(.*?)(</(\2)>)",
-                            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-                        ),
-                        item,
-                    )
-                )
-                > 0
-            ):
-                # unindent after instead of before
-                tmp = (indent * indent_level) + item + "\n"
-                indent_level = max(indent_level - 1, 0)
-            else:
-                indent_level = max(indent_level - 1, 0)
-                tmp = (indent * indent_level) + item + "\n"
+        elif line_class == UNINDENT:
+            indent_level = max(indent_level - 1, 0)
+            tmp = (indent * indent_level) + item + "\n"
 
-        elif (
-            re.search(
-                r"^" + str(config.tag_unindent_line),
-                item,
-                re.IGNORECASE | re.MULTILINE | re.VERBOSE,
-            )
-            and is_block_raw is False
-        ):
+        elif line_class == UNINDENT_LINE:
             tmp = (indent * (indent_level - 1)) + item + "\n"
 
-        # if indent, move right
-        elif (
-            re.search(
-                re.compile(
-                    r"^(?:" + str(config.tag_indent) + r")",
-                    re.IGNORECASE | re.MULTILINE | re.VERBOSE,
-                ),
-                item,
-            )
-            and is_block_raw is False
-        ):
+        elif line_class == INDENT:
             tmp = (indent * indent_level) + item + "\n"
             indent_level = indent_level + 1
 
-        elif is_raw_first_line is True or (
-            is_safe_closing_tag(config, item) and is_block_raw is False
-        ):
+        elif is_raw_first_line is True or (is_safe_closing and is_block_raw is False):
             tmp = (indent * indent_level) + item + "\n"
 
         elif is_block_raw is True or item.strip() == "":
@@ -190,43 +149,43 @@ def indent_html(rawcode: str, config: Config) -> str:
 
         # if a opening raw tag then start ignoring.. only if there is no closing tag
         # on the same line
-        if is_ignored_block_opening(config, item):
+        if is_opening:
             is_block_raw = True
             is_raw_first_line = False
 
-        # if a normal tag, we can try to expand attributes
-        elif is_block_raw is False:
+        # if a normal tag, we can try to expand attributes. Only attributes
+        # longer than max_attribute_length are changed.
+        elif (
+            is_block_raw is False
+            and "<" in item
+            and len(item) >= config.max_attribute_length
+        ):
             # get leading space, and attributes
 
-            func = partial(format_attributes, config, item)
+            func = partial(format_attributes, config, IgnoredRegions(config, item))
 
-            tmp = re.sub(
-                re.compile(
-                    rf"(\s*?)(<(?:{config.indent_html_tags})\b)((?:\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])+?)(/?>)",
-                    re.VERBOSE | re.IGNORECASE,
-                ),
-                func,
-                tmp,
-            )
+            tmp = config.patterns.html_tag_attributes.sub(func, tmp)
 
         # turn off raw block if we hit end - for one line raw blocks, but not an inline raw
         if is_ignored_block_closing(config, item):
-            if not is_safe_closing_tag(config, item):
+            if not is_safe_closing:
                 ignored_level -= 1
                 ignored_level = max(ignored_level, 0)
             if ignored_level == 0:
                 is_block_raw = False
 
-        beautified_code = beautified_code + tmp
+        beautified_lines.append(tmp)
+
+    beautified_code = "".join(beautified_lines)
 
     # we can try to fix template tags. ignore handlebars
     if config.profile not in ["handlebars", "golang"]:
 
         def fix_non_handlebars_template_tags(
-            html: str, out_format: str, match: re.Match
+            regions: IgnoredRegions, out_format: str, match: re.Match
         ) -> str:
 
-            if inside_ignored_block(config, html, match):
+            if regions.inside_ignored_block(match):
                 return match.group()
 
             return out_format % (
@@ -235,17 +194,29 @@ def indent_html(rawcode: str, config: Config) -> str:
                 match.group(3),
             )
 
-        func = partial(fix_non_handlebars_template_tags, beautified_code, "%s %s%s")
+        func = partial(
+            fix_non_handlebars_template_tags,
+            regions_cache.get(beautified_code),
+            "%s %s%s",
+        )
         beautified_code = re.sub(
             r"({[{|%]\-?)(\w[^}].+?)([}|%]})", func, beautified_code
         )
 
-        func = partial(fix_non_handlebars_template_tags, beautified_code, "%s%s %s")
+        func = partial(
+            fix_non_handlebars_template_tags,
+            regions_cache.get(beautified_code),
+            "%s%s %s",
+        )
         beautified_code = re.sub(
             r"({[{|%])([^}].+?[^(?:\ |\-)])([}|%]})", func, beautified_code
         )
 
-        func = partial(fix_non_handlebars_template_tags, beautified_code, "%s%s %s")
+        func = partial(
+            fix_non_handlebars_template_tags,
+            regions_cache.get(beautified_code),
+            "%s%s %s",
+        )
         beautified_code = re.sub(
             r"({[{|%])([^}].+?[^ -])(\-+?[}|%]})", func, beautified_code
         )
@@ -253,10 +224,10 @@ def indent_html(rawcode: str, config: Config) -> str:
     elif config.profile == "handlebars":
 
         def fix_handlebars_template_tags(
-            html: str, out_format: str, match: re.Match
+            regions: IgnoredRegions, out_format: str, match: re.Match
         ) -> str:
 
-            if inside_ignored_block(config, html, match):
+            if regions.inside_ignored_block(match):
                 return match.group()
 
             return out_format % (
@@ -264,7 +235,11 @@ def indent_html(rawcode: str, config: Config) -> str:
                 match.group(2),
             )
 
-        func = partial(fix_handlebars_template_tags, beautified_code, "%s %s")
+        func = partial(
+            fix_handlebars_template_tags,
+            regions_cache.get(beautified_code),
+            "%s %s",
+        )
         # handlebars templates
         beautified_code = re.sub(r"({{#(?:each|if).+?[^ ])(}})", func, beautified_code)
 
@@ -1,5 +1,6 @@
 """djLint function to call jsbeautifier."""
 from functools import partial
+from typing import List
 
 import jsbeautifier
 import regex as re
@@ -22,7 +23,7 @@ def format_js(html: str, config: Config) -> str:
         opts = BeautifierOptions(config.js_config)
 
         beautified_lines = jsbeautifier.beautify(match.group(3), opts).splitlines()
-        beautified = ""
+        beautified: List[str] = []
 
         # add indent back
         ignore_indent = False
@@ -39,10 +40,10 @@ def format_js(html: str, config: Config) -> str:
                 ignore_indent = False
 
             if ignore_indent is False and line:
-                beautified += "\n" + inner_indent + line
+                beautified.append("\n" + inner_indent + line)
 
             else:
-                beautified += "\n" + line
+                beautified.append("\n" + line)
 
             if re.search(
                 re.compile(
@@ -53,7 +54,7 @@ def format_js(html: str, config: Config) -> str:
             ):
                 ignore_indent = True
 
-        return match.group(1) + match.group(2) + beautified + "\n" + indent
+        return match.group(1) + match.group(2) + "".join(beautified) + "\n" + indent
 
     func = partial(launch_formatter, config)
 
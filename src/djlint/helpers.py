@@ -1,4 +1,8 @@
 """Collection of shared djLint functions."""
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Set, Tuple
+
 import regex as re
 
 from .settings import Config
@@ -11,25 +15,14 @@ def is_ignored_block_opening(config: Config, item: str) -> bool:
     single line block.
     """
     last_index = 0
-    inline = list(
-        re.finditer(
-            config.ignored_blocks,
-            item,
-            flags=re.IGNORECASE | re.VERBOSE | re.MULTILINE | re.DOTALL,
-        )
-    )
+    inline = list(config.patterns.ignored_blocks.finditer(item))
 
     if inline:
         last_index = inline[
             -1
         ].end()  # get the last index. The ignored opening should start after this.
 
-    return bool(
-        re.search(
-            re.compile(config.ignored_block_opening, re.IGNORECASE | re.VERBOSE),
-            item[last_index:],
-        )
-    )
+    return bool(config.patterns.ignored_block_opening.search(item[last_index:]))
 
 
 def is_ignored_block_closing(config: Config, item: str) -> bool:
@@ -39,22 +32,14 @@ def is_ignored_block_closing(config: Config, item: str) -> bool:
     single line block.
     """
     last_index = 0
-    inline = list(
-        re.finditer(
-            re.compile(config.ignored_inline_blocks, flags=re.IGNORECASE | re.VERBOSE),
-            item,
-        )
-    )
+    inline = list(config.patterns.ignored_inline_blocks.finditer(item))
 
     if inline:
         last_index = inline[
             -1
         ].end()  # get the last index. The ignored opening should start after this.
 
-    return re.search(
-        re.compile(config.ignored_block_closing, flags=re.IGNORECASE | re.VERBOSE),
-        item[last_index:],
-    )
+    return config.patterns.ignored_block_closing.search(item[last_index:])
 
 
 def is_safe_closing_tag(config: Config, item: str) -> bool:
@@ -64,114 +49,159 @@ def is_safe_closing_tag(config: Config, item: str) -> bool:
     single line block.
     """
     last_index = 0
-    inline = list(
-        re.finditer(
-            re.compile(
-                config.ignored_inline_blocks + r" | " + config.ignored_blocks,
-                flags=re.IGNORECASE | re.VERBOSE | re.MULTILINE | re.DOTALL,
-            ),
-            item,
-        )
-    )
+    inline = list(config.patterns.ignored_inline_and_blocks.finditer(item))
 
     if inline:
         last_index = inline[
             -1
         ].end()  # get the last index. The ignored opening should start after this.
 
-    return re.search(
-        re.compile(config.safe_closing_tag, flags=re.IGNORECASE | re.VERBOSE),
-        item[last_index:],
-    )
-
-
-def inside_template_block(config: Config, html: str, match: re.Match) -> bool:
-    """Check if a re.Match is inside of a template block."""
-    return any(
-        ignored_match.start(0) <= match.start() and match.end(0) <= ignored_match.end()
-        for ignored_match in list(
-            re.finditer(
-                re.compile(
-                    config.template_blocks,
-                    re.DOTALL | re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-                ),
-                html,
-            )
-        )
-    )
-
-
-def inside_ignored_block(config: Config, html: str, match: re.Match) -> bool:
-    """Do not add whitespace if the tag is in a non indent block."""
-    return any(
-        ignored_match.start(0) <= match.start() and match.end(0) <= ignored_match.end()
-        for ignored_match in list(
-            re.finditer(
-                re.compile(
-                    config.ignored_blocks,
-                    re.DOTALL | re.IGNORECASE | re.VERBOSE | re.MULTILINE,
-                ),
-                html,
-            )
-        )
-        + list(
-            re.finditer(
-                re.compile(config.ignored_inline_blocks, re.IGNORECASE | re.VERBOSE),
-                html,
+    return config.patterns.safe_closing_tag.search(item[last_index:])
+
+
+class IgnoredRegions:
+    """Index of the ignored and template regions of a block of html.
+
+    The regions are found once, on first use, and held as sorted
+    offset lists so that checking a match is a bisect instead of a
+    rescan of the whole document.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        html: str,
+        ignored_spans: Optional[List[Tuple[List[int], List[int]]]] = None,
+    ) -> None:
+        """Set up an empty index, regions are found on first use."""
+        self.config = config
+        self.html = html
+        # ignored block spans can be given when they are already known.
+        self._ignored_spans = ignored_spans
+        self._template_spans: Optional[Tuple[List[int], List[int]]] = None
+        self._ignored_rules: Optional[List[Tuple[int, int, Set[str]]]] = None
+
+    def _find_spans(self, pattern: re.Pattern) -> Tuple[List[int], List[int]]:
+        """Get the start and end offsets of all matches of a pattern."""
+        starts: List[int] = []
+        ends: List[int] = []
+        for ignored_match in pattern.finditer(self.html):
+            starts.append(ignored_match.start())
+            ends.append(ignored_match.end())
+        return starts, ends
+
+    @property
+    def ignored_spans(self) -> List[Tuple[List[int], List[int]]]:
+        """Ignored blocks and ignored inline blocks.
+
+        Matches of a single pattern never overlap, so each pattern keeps
+        its own sorted list of spans.
+        """
+        if self._ignored_spans is None:
+            self._ignored_spans = [
+                self._find_spans(self.config.patterns.ignored_blocks),
+                self._find_spans(self.config.patterns.ignored_inline_blocks),
+            ]
+        return self._ignored_spans
+
+    @property
+    def template_spans(self) -> Tuple[List[int], List[int]]:
+        """Template blocks."""
+        if self._template_spans is None:
+            self._template_spans = self._find_spans(
+                self.config.patterns.template_blocks
             )
+        return self._template_spans
+
+    @property
+    def ignored_rules(self) -> List[Tuple[int, int, Set[str]]]:
+        """Blocks where linter rules are turned off, with the ignored codes."""
+        if self._ignored_rules is None:
+            self._ignored_rules = [
+                (
+                    ignored_match.start(),
+                    ignored_match.end(),
+                    set(re.split(r"\s|,", ignored_match.group(1).strip())),
+                )
+                for rule_regex in self.config.ignored_rules
+                for ignored_match in self.config.patterns.get(
+                    rule_regex, re.DOTALL | re.IGNORECASE | re.VERBOSE
+                ).finditer(self.html)
+            ]
+        return self._ignored_rules
+
+    @staticmethod
+    def _contains(spans: Tuple[List[int], List[int]], start: int, end: int) -> bool:
+        """Check if a span fully contains the range start-end."""
+        starts, ends = spans
+        # only the last span starting before the range can contain it.
+        index = bisect_right(starts, start) - 1
+        return index >= 0 and end <= ends[index]
+
+    def inside_template_block(self, match: re.Match) -> bool:
+        """Check if a re.Match is inside of a template block."""
+        return self._contains(self.template_spans, match.start(), match.end())
+
+    def inside_ignored_block(self, match: re.Match) -> bool:
+        """Do not add whitespace if the tag is in a non indent block."""
+        return any(
+            self._contains(spans, match.start(), match.end())
+            for spans in self.ignored_spans
         )
-    )
 
-
-def overlaps_ignored_block(config: Config, html: str, match: re.Match) -> bool:
-    """Do not add whitespace if the tag is in a non indent block."""
-    return any(
+    def overlaps_ignored_block(self, start: int, end: int) -> bool:
+        """Check if the range start-end overlaps an ignored block."""
         # don't require the match to be fully inside the ignored block.
         # poorly build html will probably span ignored blocks and should be ignored.
-        (
-            ignored_match.start(0) <= match.start()
-            and match.start() <= ignored_match.end()
-        )
-        or (
-            ignored_match.start(0) <= match.end() and match.end() <= ignored_match.end()
+        return any(
+            self._contains(spans, start, start) or self._contains(spans, end, end)
+            for spans in self.ignored_spans
         )
-        for ignored_match in list(
-            re.finditer(
-                re.compile(
-                    config.ignored_blocks,
-                    re.DOTALL | re.IGNORECASE | re.VERBOSE | re.MULTILINE | re.DOTALL,
-                ),
-                html,
-            )
-        )
-        + list(
-            re.finditer(
-                re.compile(config.ignored_inline_blocks, re.IGNORECASE | re.VERBOSE),
-                html,
-            )
+
+    def inside_ignored_rule(self, start: int, end: int, rule: str) -> bool:
+        """Check if the range start-end is inside an ignored pattern."""
+        return any(
+            rule in codes
+            and ignored_start <= start <= ignored_end
+            or ignored_start <= end <= ignored_end
+            for ignored_start, ignored_end, codes in self.ignored_rules
         )
-    )
 
 
-def inside_ignored_rule(config: Config, html: str, match: re.Match, rule: str) -> bool:
-    """Check if match is inside an ignored pattern."""
-    for rule_regex in config.ignored_rules:
-        for ignored_match in list(
-            re.finditer(
-                re.compile(rule_regex, re.DOTALL | re.IGNORECASE | re.VERBOSE),
-                html,
-            )
-        ):
-            if (
-                rule in list(set(re.split(r"\s|,", ignored_match.group(1).strip())))
-                and (
-                    ignored_match.start(0) <= match.start()
-                    and match.start() <= ignored_match.end()
-                )
-                or (
-                    ignored_match.start(0) <= match.end()
-                    and match.end() <= ignored_match.end()
-                )
-            ):
-                return True
-    return False
+class RegionsCache:
+    """IgnoredRegions of the latest html seen in one format.
+
+    The formatter stages check matches against the html as it is before
+    each rewrite. Rewrites often leave the html unchanged, and then the
+    index built for it before is reused instead of scanning it again.
+    A cache is made for each format, so no html is held after it.
+    """
+
+    def __init__(self, config: Config) -> None:
+        """Start with no html seen."""
+        self.config = config
+        self._latest: Optional[IgnoredRegions] = None
+
+    def get(self, html: str) -> IgnoredRegions:
+        """Get the IgnoredRegions of a block of html."""
+        if self._latest is None or self._latest.html != html:
+            self._latest = IgnoredRegions(self.config, html)
+        return self._latest
+
+
+class LineIndex:
+    """Start offset of each line in a block of text.
+
+    Offsets are found once and held in a compact array, so finding the
+    line of an offset is a bisect.
+    """
+
+    def __init__(self, text: str) -> None:
+        """Find the line starts of a block of text."""
+        self.starts = array("l", [0])
+        self.starts.extend(match.end() for match in re.finditer(r"\n", text))
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Get the line number and column of an offset, line numbers start at 1."""
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1]
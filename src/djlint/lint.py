@@ -1,11 +1,21 @@
 """Djlint html linter."""
-import copy
+from collections import defaultdict, deque
 from pathlib import Path
-from typing import Dict, List
+from typing import (
+    DefaultDict,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 import regex as re
 
-from .helpers import inside_ignored_rule, overlaps_ignored_block
+from .cache import Cache
+from .helpers import IgnoredRegions, LineIndex
 from .settings import Config
 
 flags = {
@@ -34,121 +44,221 @@ def build_flags(flag_list: str) -> int:
     return combined_flags
 
 
-def get_line(start: int, line_ends: List) -> str:
-    """Get the line number and index of match."""
-    line = list(filter(lambda pair: pair["end"] > start, line_ends))[0]
+class LintError(NamedTuple):
+    """A rule match in a file.
 
-    # pylint: disable=C0209
-    return "%d:%d" % (line_ends.index(line) + 1, start - line["start"])
+    Errors are hashable, so duplicates can be removed with a set.
+    """
 
+    code: str
+    line: int
+    col: int
+    match: str
+    message: str
 
-def lint_file(config: Config, this_file: Path) -> Dict:
+
+def build_error(
+    rule: Dict, html: str, span: Tuple[int, int], lines: LineIndex
+) -> LintError:
+    """Build an error for a rule match."""
+    start, end = span
+    line, col = lines.position(start)
+    return LintError(
+        rule["name"], line, col, html[start:end].strip()[:20], rule["message"]
+    )
+
+
+class Literals:
+    """Checks for literal text in a block of html.
+
+    The casefolded html used for case insensitive checks is only built
+    when first needed.
+    """
+
+    def __init__(self, html: str) -> None:
+        """Hold the html to check."""
+        self.html = html
+        self._folded: Optional[str] = None
+
+    def contains(self, literals: List[str], rule_flags: int) -> bool:
+        """Check if all literals are in the html."""
+        if rule_flags & re.IGNORECASE:
+            if self._folded is None:
+                self._folded = self.html.casefold()
+            return all(x.casefold() in self._folded for x in literals)
+
+        return all(x in self.html for x in literals)
+
+
+def find_orphan_tags(config: Config, html: str) -> List[re.Match]:
+    """Find html tags that are not opened or not closed.
+
+    Tags are matched by name with a stack per name. A close tag takes
+    the latest unmatched tag of the same name, or is an orphan if there
+    is none. Orphans are returned last first.
+    """
+    stacks: DefaultDict[str, Deque[re.Match]] = defaultdict(deque)
+    self_closing_tag = config.patterns.always_self_closing_html_tag
+    # tag names repeat, so each is only checked once.
+    self_closing: Dict[str, bool] = {}
+
+    for match in config.patterns.html_tag.finditer(html):
+        tag = match.group(1)
+        if tag not in self_closing:
+            self_closing[tag] = bool(self_closing_tag.search(tag))
+
+        if tag and not self_closing[tag]:
+            stack = stacks[match.group(2)]
+
+            # close tags should equal open tags
+            if tag[0] == "/" and stack:
+                stack.pop()
+            else:
+                stack.append(match)
+
+    return sorted(
+        (match for stack in stacks.values() for match in stack),
+        key=lambda x: x.start(),
+        reverse=True,
+    )
+
+
+def lint_file(config: Config, this_file: Path, cache: Optional[Cache] = None) -> Dict:
     """Check file for formatting errors."""
     filename = str(this_file)
-    errors: dict = {filename: []}
     html = this_file.read_text(encoding="utf8")
 
-    # build list of line ends for file
-    line_ends = [
-        {"start": m.start(), "end": m.end()}
-        for m in re.finditer(r"(?:.*\n)|(?:[^\n]+$)", html)
-    ]
+    if cache:
+        cached = cache.get("lint", this_file, html)
+        if cached is not None:
+            return {filename: [LintError(*error) for error in cached["errors"]]}
+
+    errors = lint_html(config, html, this_file)
+
+    if cache:
+        cache.store("lint", this_file, html, {"errors": errors})
+
+    return {filename: errors}
+
+
+def lint_html(
+    config: Config, html: str, this_file: Optional[Path] = None
+) -> List[LintError]:
+    """Check a block of html for formatting errors.
 
+    Per file ignores are only used when the path of the html is given.
+    """
+    literals = Literals(html)
+    rules = file_rules(config, this_file, literals)
+
+    return build_errors(
+        config,
+        html,
+        rules,
+        {
+            key: [match.span() for match in find_matches(config, html, key, literals)]
+            for key in rule_patterns(rules)
+        },
+    )
+
+
+def file_rules(
+    config: Config, this_file: Optional[Path], literals: Literals
+) -> List[Dict]:
+    """Get the rules to check a file with.
+
+    Rules ignored for the file, and rules that cannot match because text
+    they need is missing, are left out.
+    """
     ignored_rules: List[str] = []
 
     # remove ignored rules for file
     for pattern, rules in config.per_file_ignores.items():
-        if re.search(pattern, this_file.as_posix(), re.VERBOSE):
+        if this_file and config.patterns.get(pattern, re.VERBOSE).search(
+            this_file.as_posix()
+        ):
             ignored_rules += [x.strip() for x in rules.split(",")]
 
-    for rule in config.linter_rules:
-        rule = rule["rule"]
+    return [
+        rule["rule"]
+        for rule in config.linter_rules
+        if rule["rule"]["name"] not in ignored_rules
+        and literals.contains(
+            rule["rule"].get("requires", []),
+            build_flags(rule["rule"].get("flags", "re.DOTALL")),
+        )
+    ]
+
+
+def rule_patterns(rules: List[Dict]) -> List[Tuple[str, int]]:
+    """Get the distinct patterns and flags of rules.
+
+    Rules can share a pattern (D018 and J018 for example), so each
+    distinct pattern is only run over the html once. H025 is left out,
+    see find_orphan_tags.
+    """
+    return list(
+        dict.fromkeys(
+            (pattern, build_flags(rule.get("flags", "re.DOTALL")))
+            for rule in rules
+            if rule["name"] != "H025"
+            for pattern in rule["patterns"]
+        )
+    )
+
+
+def find_matches(
+    config: Config, html: str, key: Tuple[str, int], literals: Literals
+) -> Iterator[re.Match]:
+    """Find the matches of a rule pattern."""
+    if not can_match(config, key, literals):
+        return iter([])
+
+    return config.patterns.get(*key).finditer(html)
 
-        for pattern in rule["patterns"]:
-            # skip ignored rules
-            if rule["name"] in ignored_rules:
-                continue
 
+def can_match(config: Config, key: Tuple[str, int], literals: Literals) -> bool:
+    """Check if a rule pattern can match, from the literal text it needs."""
+    literal = config.patterns.literal(*key)
+    return literal is None or literals.contains([literal], key[1])
+
+
+def build_errors(
+    config: Config,
+    html: str,
+    rules: List[Dict],
+    matches: Dict[Tuple[str, int], List[Tuple[int, int]]],
+    regions: Optional[IgnoredRegions] = None,
+) -> List[LintError]:
+    """Build the errors of rule matches that are not ignored.
+
+    matches has the start and end offsets of the matches of each pattern.
+    """
+    errors: List[LintError] = []
+
+    # line starts are found once and shared by all rules
+    lines = LineIndex(html)
+
+    # ignored blocks are found once and shared by all rules
+    regions = regions or IgnoredRegions(config, html)
+
+    for rule in rules:
+        rule_flags = build_flags(rule.get("flags", "re.DOTALL"))
+
+        for pattern in rule["patterns"]:
             # rule H025 is a special case where the output must be an even number.
-            if rule["name"] == "H025":
-
-                open_tags: List[re.Match] = []
-
-                # for match in re.finditer(
-                #     re.compile(
-                #         pattern, flags=build_flags(rule.get("flags", "re.DOTALL"))
-                #     ),
-                #     html,
-                # ):
-                # print(r"<(/?(\w+))\s*" +config.attribute_pattern + r"\s*?>")
-                for match in re.finditer(
-                    re.compile(
-                        r"<(/?(\w+))\s*(" + config.attribute_pattern + r"|\s*)*\s*?>",
-                        re.VERBOSE,
-                    ),
-                    html,
-                ):
-                    # print(match)
-                    # print(match.group(2))
-                    # print(match.group(1))
-                    if match.group(1) and not re.search(
-                        re.compile(
-                            rf"^/?{config.always_self_closing_html_tags}\b", re.I | re.X
-                        ),
-                        match.group(1),
-                    ):
-                        # close tags should equal open tags
-                        if match.group(1)[0] != "/":
-                            open_tags.insert(0, match)
-                        else:
-                            for i, tag in enumerate(copy.deepcopy(open_tags)):
-                                if tag.group(2) == match.group(1)[1:]:
-                                    open_tags.pop(i)
-                                    break
-                            else:
-                                # there was no open tag matching the close tag
-                                open_tags.insert(0, match)
-
-                for match in open_tags:
-                    if (
-                        overlaps_ignored_block(config, html, match) is False
-                        and inside_ignored_rule(config, html, match, rule["name"])
-                        is False
-                    ):
-                        errors[filename].append(
-                            {
-                                "code": rule["name"],
-                                "line": get_line(match.start(), line_ends),
-                                "match": match.group().strip()[:20],
-                                "message": rule["message"],
-                            }
-                        )
-            else:
-                for match in re.finditer(
-                    re.compile(
-                        pattern, flags=build_flags(rule.get("flags", "re.DOTALL"))
-                    ),
-                    html,
+            spans = (
+                [match.span() for match in find_orphan_tags(config, html)]
+                if rule["name"] == "H025"
+                else matches[pattern, rule_flags]
+            )
+
+            for start, end in spans:
+                if (
+                    regions.overlaps_ignored_block(start, end) is False
+                    and regions.inside_ignored_rule(start, end, rule["name"]) is False
                 ):
-                    if (
-                        overlaps_ignored_block(config, html, match) is False
-                        and inside_ignored_rule(config, html, match, rule["name"])
-                        is False
-                    ):
-                        errors[filename].append(
-                            {
-                                "code": rule["name"],
-                                "line": get_line(match.start(), line_ends),
-                                "match": match.group().strip()[:20],
-                                "message": rule["message"],
-                            }
-                        )
+                    errors.append(build_error(rule, html, (start, end), lines))
 
     # remove duplicate matches
-    for filename, error_dict in errors.items():
-        unique_errors = []
-        for dict_ in error_dict:
-            if dict_ not in unique_errors:
-                unique_errors.append(dict_)
-        errors[filename] = unique_errors
-    return errors
+    return list(dict.fromkeys(errors))
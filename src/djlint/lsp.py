@@ -0,0 +1,563 @@
+"""Run djLint as a language server.
+
+The server speaks the Language Server Protocol over stdin and stdout.
+Open documents are held in memory, and each project's Config stays
+loaded, so editors get live lint errors without starting djLint for
+every change.
+
+A document is fully linted when it is opened or saved. The matches of
+each rule pattern are kept, so after a change a pattern is only searched
+again from CONTEXT_LINES before the change until its matches line up with
+the earlier ones. Errors are then built from all the matches, so ignored
+blocks and orphan tags (H025) are always checked in the whole document.
+
+A regex can fail or succeed because of text far past the end of its
+match. Such matches, starting more than CONTEXT_LINES before a change,
+are only found again when the document is saved.
+
+run::
+
+   djlint --lsp
+"""
+import json
+import sys
+import traceback
+from bisect import bisect_left, bisect_right
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import regex as re
+
+from .helpers import IgnoredRegions, LineIndex
+from .lint import (
+    LintError,
+    Literals,
+    build_errors,
+    can_match,
+    file_rules,
+    rule_patterns,
+)
+from .settings import Config, find_project_root, settings_stamps
+from .src import has_pragma
+
+# lines before a change that are searched again with it, as rules can
+# match text over several lines.
+CONTEXT_LINES = 20
+
+LOOKBEHIND = re.compile(r"\(\?<[=!]")
+
+# json-rpc error codes
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+# lsp diagnostic severities
+ERROR = 1
+WARNING = 2
+
+# lsp text document sync kind, changes are sent as edits.
+INCREMENTAL = 2
+
+
+def utf16_length(text: str) -> int:
+    """Get the length of text in utf-16 code units, as lsp counts columns."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def from_utf16(line: str, character: int) -> int:
+    """Get the column of an lsp character offset in a line."""
+    units = 0
+    for col, char in enumerate(line):
+        if units >= character:
+            return col
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+def uri_to_path(uri: str) -> Path:
+    """Get the path of a document uri."""
+    return Path(url2pathname(urlparse(uri).path))
+
+
+class Configs:
+    """Configs kept loaded, one per project.
+
+    A Config is reused while the project's settings files are unchanged.
+    """
+
+    def __init__(self) -> None:
+        """Start with no Configs loaded."""
+        self.configs: Dict[Path, Tuple[List[Tuple[str, int, int]], Config]] = {}
+
+    def get(self, path: Path) -> Config:
+        """Get the Config of a document."""
+        root = find_project_root(path)
+        stamps = settings_stamps(root)
+
+        if root not in self.configs or self.configs[root][0] != stamps:
+            self.configs[root] = (stamps, Config(str(path)))
+
+        return self.configs[root][1]
+
+
+Span = Tuple[int, int]
+
+
+def move_span(span: Span, start: int, end: int, length: int) -> Span:
+    """Move a span after the text from start to end is replaced.
+
+    length is the length of the new text. Offsets inside the replaced
+    text move to its edges.
+    """
+    delta = length - (end - start)
+
+    def move(offset: int, edge: int) -> int:
+        if offset <= start:
+            return offset
+        if offset >= end:
+            return offset + delta
+        return edge
+
+    return move(span[0], start), move(span[1], start + length)
+
+
+def rescan(
+    pattern: re.Pattern, text: str, spans: List[Span], changed: Span, pos: int
+) -> List[Span]:
+    r"""Update the match spans of a pattern after a change.
+
+    spans are the spans from before the change, moved with the text. The
+    pattern is searched from pos, which must be before any match the
+    change can affect. Once the search reaches text after the change at
+    a place where the earlier search also was, the rest of the matches
+    are the same as before and are kept.
+
+    A match can depend on the character before it, as with "^" or "\b",
+    so that place must be past the first character after the change.
+    A lookbehind can depend on any text before the match, so patterns
+    with one are searched to the end of the text.
+    """
+    starts = [start for start, _ in spans]
+    index = bisect_left(starts, pos)
+
+    # the earlier search was not at pos if it is inside a match, so the
+    # search starts at that match.
+    if index > 0 and spans[index - 1][1] > pos:
+        index -= 1
+        pos = spans[index][0]
+    kept = spans[:index]
+
+    stop = changed[1] + 1
+    if LOOKBEHIND.search(pattern.pattern):
+        stop = len(text) + 1
+
+    def sync_point(offset: int) -> int:
+        """Get the first place past the change the earlier search was at.
+
+        The place is at or after offset.
+        """
+        offset = max(offset, stop)
+        index = bisect_left(starts, offset) - 1
+        if index >= 0 and spans[index][1] > offset:
+            return spans[index][1]
+        return offset
+
+    found: List[Span] = []
+    offset = pos
+
+    while True:
+        synced = sync_point(offset)
+        # the search stops at the next earlier match after synced at the
+        # latest, as it is found again.
+        match = pattern.search(text, offset)
+
+        if match is None or match.start() >= synced:
+            return kept + found + spans[bisect_left(starts, synced) :]  # noqa:E203
+
+        found.append(match.span())
+        # an empty match is not found again at the same place.
+        offset = match.end() + (match.end() == match.start())
+
+
+class Document:
+    """An open document and its lint errors.
+
+    The start and end offsets of the matches of each rule pattern and
+    ignored block pattern are kept, so that a change only needs a search
+    of the text around it.
+    """
+
+    def __init__(self, path: Path, text: str, config: Config) -> None:
+        """Open a document and lint it."""
+        self.path = path
+        self.config = config
+        self.text = text
+        self.lines = LineIndex(text)
+        self.matches: Dict[Tuple[str, int], List[Span]] = {}
+        # the text covered by matches removed because they overlapped a
+        # change, for each pattern.
+        self.dropped: Dict[Tuple[str, int], Span] = {}
+        self.errors: List[LintError] = []
+        self.lint()
+
+    def line_text(self, line: int) -> str:
+        """Get the text of a line, line numbers start at 0."""
+        starts = self.lines.starts
+        if line >= len(starts):
+            return ""
+        end = starts[line + 1] - 1 if line + 1 < len(starts) else len(self.text)
+        return self.text[starts[line] : end]  # noqa:E203
+
+    def offset(self, position: Dict[str, int]) -> int:
+        """Get the offset of an lsp position."""
+        line = position["line"]
+        if line >= len(self.lines.starts):
+            return len(self.text)
+        return self.lines.starts[line] + from_utf16(
+            self.line_text(line), position["character"]
+        )
+
+    def lint(self, changed: Optional[Span] = None) -> None:
+        """Lint the document.
+
+        With the changed span of the text, patterns that were already
+        searched are only searched again around it. Text without a pragma
+        is not checked when the config requires one.
+        """
+        if self.config.require_pragma and not has_pragma(self.config, self.text):
+            self.matches = {}
+            self.dropped = {}
+            self.errors = []
+            return
+
+        literals = Literals(self.text)
+        rules = file_rules(self.config, self.path, literals)
+        ignored_patterns = {
+            (pattern.pattern, pattern.flags): pattern
+            for pattern in (
+                self.config.patterns.ignored_blocks,
+                self.config.patterns.ignored_inline_blocks,
+            )
+        }
+
+        # rule patterns that cannot match have no matches to keep.
+        patterns = {
+            key: self.config.patterns.get(*key)
+            for key in rule_patterns(rules)
+            if can_match(self.config, key, literals)
+        }
+        matches: Dict[Tuple[str, int], List[Span]] = {
+            key: [] for key in rule_patterns(rules) if key not in patterns
+        }
+        patterns.update(ignored_patterns)
+
+        for key, pattern in patterns.items():
+            if changed is None or key not in self.matches:
+                matches[key] = [match.span() for match in pattern.finditer(self.text)]
+            else:
+                # the earlier search was inside removed matches, so the
+                # text they covered is searched again.
+                dropped = self.dropped.get(key, changed)
+                region = (min(changed[0], dropped[0]), max(changed[1], dropped[1]))
+
+                # an ignored block changes which errors are shown in all of
+                # it, so the search for them is not limited.
+                pos = self.search_start(key, region, key not in ignored_patterns)
+                matches[key] = rescan(
+                    pattern, self.text, self.matches[key], region, pos
+                )
+
+        # patterns that were not searched have no matches to keep.
+        self.matches = {key: matches[key] for key in patterns}
+        self.dropped = {}
+        self.errors = build_errors(
+            self.config,
+            self.text,
+            rules,
+            matches,
+            IgnoredRegions(
+                self.config,
+                self.text,
+                [
+                    (
+                        [start for start, _ in matches[key]],
+                        [end for _, end in matches[key]],
+                    )
+                    for key in ignored_patterns
+                ],
+            ),
+        )
+
+    def search_start(self, key: Tuple[str, int], changed: Span, limit: bool) -> int:
+        """Get the offset to search a pattern from after a change.
+
+        The search starts CONTEXT_LINES before the change, as a match
+        before the change can end differently or start earlier because of
+        it. Without limit, it also starts no later than the last match
+        before the change.
+        """
+        line = self.lines.position(changed[0])[0]
+        pos = self.lines.starts[max(0, line - 1 - CONTEXT_LINES)]
+
+        if not limit:
+            spans = self.matches[key]
+            index = bisect_right(spans, (changed[0], len(self.text))) - 1
+            if index >= 0:
+                pos = min(pos, spans[index][0])
+
+        return min(pos, changed[0])
+
+    def change(self, changes: List[Dict[str, Any]]) -> None:
+        """Apply edits to the document, then lint it again."""
+        changed: Optional[Span] = None
+
+        for change in changes:
+            if "range" not in change:
+                self.text = change["text"]
+                self.lines = LineIndex(self.text)
+                self.matches = {}
+                self.dropped = {}
+                changed = None
+                continue
+
+            start = self.offset(change["range"]["start"])
+            end = self.offset(change["range"]["end"])
+            length = len(change["text"])
+
+            self.text = self.text[:start] + change["text"] + self.text[end:]
+            self.lines = LineIndex(self.text)
+            self.dropped = {
+                key: move_span(span, start, end, length)
+                for key, span in self.dropped.items()
+            }
+            for key, spans in self.matches.items():
+                moved = []
+                for span in spans:
+                    # matches overlapping the change are removed.
+                    overlaps = (
+                        span[0] < end and span[1] > start or start < span[0] < end
+                    )
+                    span = move_span(span, start, end, length)
+
+                    if overlaps:
+                        dropped = self.dropped.get(key, span)
+                        self.dropped[key] = (
+                            min(dropped[0], span[0]),
+                            max(dropped[1], span[1]),
+                        )
+                    else:
+                        moved.append(span)
+                self.matches[key] = moved
+
+            changed_start, changed_end = (
+                (start, start + length)
+                if changed is None
+                else move_span(changed, start, end, length)
+            )
+            changed = (min(changed_start, start), max(changed_end, start + length))
+
+        self.lint(changed)
+
+    def diagnostics(self) -> List[Dict[str, Any]]:
+        """Get the lint errors as lsp diagnostics."""
+        severity = WARNING if self.config.warn else ERROR
+        diagnostics = []
+
+        for error in self.errors:
+            line = self.line_text(error.line - 1)
+            character = utf16_length(line[: error.col])
+            length = utf16_length(error.match.split("\n")[0])
+
+            diagnostics.append(
+                {
+                    "range": {
+                        "start": {"line": error.line - 1, "character": character},
+                        "end": {
+                            "line": error.line - 1,
+                            "character": character + length,
+                        },
+                    },
+                    "severity": severity,
+                    "code": error.code,
+                    "source": "djlint",
+                    "message": error.message,
+                }
+            )
+
+        return diagnostics
+
+
+class Server:
+    """Language server reading messages from one stream and writing to another."""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO) -> None:
+        """Set up a server with no open documents."""
+        self.reader = reader
+        self.writer = writer
+        self.configs = Configs()
+        self.documents: Dict[str, Document] = {}
+        self.is_shutdown = False
+
+        self.requests: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+        }
+        self.notifications: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didSave": self.did_save,
+            "textDocument/didClose": self.did_close,
+        }
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Read a message, or None at the end of the stream."""
+        length = 0
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+
+            header = header.strip()
+            if not header:
+                break
+
+            name, _, value = header.decode("ascii").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+
+        return json.loads(self.reader.read(length))
+
+    def write(self, message: Dict[str, Any]) -> None:
+        """Write a message."""
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf8")
+        self.writer.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        self.writer.flush()
+
+    def publish(self, uri: str) -> None:
+        """Send the lint errors of a document."""
+        document = self.documents.get(uri)
+        self.write(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {
+                    "uri": uri,
+                    "diagnostics": document.diagnostics() if document else [],
+                },
+            }
+        )
+
+    def initialize(self, _: Dict[str, Any]) -> Dict[str, Any]:
+        """Tell the client what the server can do."""
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": INCREMENTAL,
+                    "save": {"includeText": False},
+                }
+            },
+            "serverInfo": {"name": "djlint"},
+        }
+
+    def shutdown(self, _: Dict[str, Any]) -> None:
+        """Stop handling documents. The client will then send exit."""
+        self.is_shutdown = True
+        self.documents.clear()
+
+    def did_open(self, params: Dict[str, Any]) -> None:
+        """Lint a document that was opened."""
+        uri = params["textDocument"]["uri"]
+        path = uri_to_path(uri)
+        self.documents[uri] = Document(
+            path, params["textDocument"]["text"], self.configs.get(path)
+        )
+        self.publish(uri)
+
+    def did_change(self, params: Dict[str, Any]) -> None:
+        """Lint the changed lines of a document."""
+        uri = params["textDocument"]["uri"]
+        if uri in self.documents:
+            self.documents[uri].change(params["contentChanges"])
+            self.publish(uri)
+
+    def did_save(self, params: Dict[str, Any]) -> None:
+        """Lint a saved document again, with settings reloaded if they changed."""
+        uri = params["textDocument"]["uri"]
+        if uri in self.documents:
+            document = self.documents[uri]
+            document.config = self.configs.get(document.path)
+            document.lint()
+            self.publish(uri)
+
+    def did_close(self, params: Dict[str, Any]) -> None:
+        """Forget a closed document and clear its errors."""
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self.publish(uri)
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        """Handle a request or a notification."""
+        method = message.get("method", "")
+        params = message.get("params") or {}
+
+        if "id" not in message:
+            if method in self.notifications:
+                try:
+                    self.notifications[method](params)
+
+                # pylint: disable=W0703
+                except Exception:
+                    traceback.print_exc()
+            return
+
+        if method not in self.requests:
+            self.write(
+                {
+                    "id": message["id"],
+                    "error": {
+                        "code": METHOD_NOT_FOUND,
+                        "message": f"Unknown method {method}.",
+                    },
+                }
+            )
+            return
+
+        try:
+            result = self.requests[method](params)
+
+        # pylint: disable=W0703
+        except Exception as error:
+            traceback.print_exc()
+            self.write(
+                {
+                    "id": message["id"],
+                    "error": {"code": INTERNAL_ERROR, "message": str(error)},
+                }
+            )
+            return
+
+        self.write({"id": message["id"], "result": result})
+
+    def serve(self) -> int:
+        """Handle messages until the client exits. Returns the exit code."""
+        while True:
+            message = self.read()
+            if message is None:
+                return 1
+
+            if message.get("method") == "exit":
+                return 0 if self.is_shutdown else 1
+
+            self.handle(message)
+
+
+def serve() -> int:
+    """Run the language server on stdin and stdout."""
+    server = Server(sys.stdin.buffer, sys.stdout.buffer)
+
+    # stdout is the protocol stream, so messages from loading settings
+    # are moved to stderr.
+    with redirect_stdout(sys.stderr):
+        return server.serve()
@@ -2,7 +2,7 @@
 import shutil
 from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple
 
 import regex as re
 from click import echo
@@ -20,23 +20,42 @@ except BaseException:
     pass
 
 
+class Totals(NamedTuple):
+    """Counts of the results printed by print_results."""
+
+    lint_error_count: int
+    format_error_count: int
+    codes: Counter
+
+
 def print_output(
-    config: Config, file_errors: List[Dict[Any, Any]], file_count: int
+    config: Config, file_errors: Iterable[Dict[Any, Any]], file_count: int
 ) -> int:
     """Print results to console."""
-    file_quantity = build_quantity(file_count)
-    # format errors
-    reformat_success_message = ""
-    lint_success_message = ""
+    return print_summary(
+        config, print_results(config, sort_results(file_errors)), file_count
+    )
+
+
+def sort_results(file_errors: Iterable[Dict[Any, Any]]) -> List[Dict[Any, Any]]:
+    """Sort results by file name."""
+    return sorted(file_errors, key=lambda x: next(iter(list(x.values())[0])))
+
+
+def print_results(config: Config, file_errors: Iterable[Dict[Any, Any]]) -> Totals:
+    """Print the results of each file.
+
+    Results are printed as they are received and only counts are kept, so
+    diffs and errors do not pile up in memory on large runs.
+    """
     lint_error_count = 0
     format_error_count = 0
+    codes: Counter = Counter()
 
-    print_blanks = config.stdin is False and config.quiet is False
-
-    if print_blanks:
+    if config.stdin is False and config.quiet is False:
         echo()
 
-    for error in sorted(file_errors, key=lambda x: next(iter(list(x.values())[0]))):
+    for error in file_errors:
         if error.get("format_message") and config.stdin is False:
             # reformat message
             format_error_count += build_check_output(error["format_message"], config)
@@ -44,9 +63,24 @@ def print_output(
         if error.get("lint_message"):
             # lint message
             lint_error_count += build_output(error["lint_message"], config)
+            codes.update(x.code for x in list(error["lint_message"].values())[0])
+
+    return Totals(lint_error_count, format_error_count, codes)
+
+
+def print_summary(config: Config, totals: Totals, file_count: int) -> int:
+    """Print statistics and result counts."""
+    file_quantity = build_quantity(file_count)
+    # format errors
+    reformat_success_message = ""
+    lint_success_message = ""
+    lint_error_count = totals.lint_error_count
+    format_error_count = totals.format_error_count
+
+    print_blanks = config.stdin is False and config.quiet is False
 
     if config.statistics and config.lint:
-        build_stats_output([x.get("lint_message") for x in file_errors], config)
+        build_stats_output(totals.codes, config)
 
     tense_message = (
         build_quantity(format_error_count) + " would be"
@@ -96,9 +130,7 @@ def build_relative_path(url: str, project_root: Path) -> str:
 
 def build_output(error: dict, config: Config) -> int:
     """Build output for file errors."""
-    errors = sorted(
-        list(error.values())[0], key=lambda x: tuple(map(int, x["line"].split(":")))
-    )
+    errors = sorted(list(error.values())[0], key=lambda x: (x.line, x.col))
     width, _ = shutil.get_terminal_size()
 
     if len(errors) == 0:
@@ -113,19 +145,17 @@ def build_output(error: dict, config: Config) -> int:
             + Style.RESET_ALL
         )
 
-    for message_dict in errors:
+    for lint_error in errors:
 
-        line = Fore.BLUE + message_dict["line"] + Style.RESET_ALL
+        line = f"{Fore.BLUE}{lint_error.line}:{lint_error.col}{Style.RESET_ALL}"
         code = (
-            (Fore.RED if message_dict["code"][:1] == "E" else Fore.YELLOW)
-            + message_dict["code"]
+            (Fore.RED if lint_error.code[:1] == "E" else Fore.YELLOW)
+            + lint_error.code
             + Style.RESET_ALL
         )
-        message = message_dict["message"]
+        message = lint_error.message
         match = (
-            Fore.BLUE
-            + re.sub(r"\s{2,}|\n", " ", message_dict["match"])
-            + Style.RESET_ALL
+            Fore.BLUE + re.sub(r"\s{2,}|\n", " ", lint_error.match) + Style.RESET_ALL
         )
 
         echo(
@@ -183,17 +213,8 @@ def build_quantity_tense(size: int) -> str:
     )
 
 
-def build_stats_output(errors: List[Optional[Any]], config: Config) -> int:
+def build_stats_output(codes: Counter, config: Config) -> int:
     """Build output for linter statistics."""
-    if len(errors) == 0:
-        return 0
-
-    codes = []
-    for error in errors:
-        if error:
-            for code in list(error.values())[0]:
-                codes.append(code["code"])
-
     messages = {
         rule["rule"]["name"]: rule["rule"]["message"] for rule in config.linter_rules
     }
@@ -207,11 +228,9 @@ def build_stats_output(errors: List[Optional[Any]], config: Config) -> int:
     if messages and codes:
 
         longest_code = len(max(messages.keys(), key=len))
-        longest_count = len(
-            str(max(Counter(codes).values(), key=lambda x: len(str(x))))
-        )
+        longest_count = len(str(max(codes.values(), key=lambda x: len(str(x)))))
 
-        for code in sorted(Counter(codes).items()):
+        for code in sorted(codes.items()):
 
             code_space = (longest_code - len(str(code[0]))) * " "
             count_space = (longest_count - len(str(code[1]))) * " "
@@ -220,4 +239,4 @@ def build_stats_output(errors: List[Optional[Any]], config: Config) -> int:
                 f"{Fore.YELLOW}{code[0]}{Fore.BLUE} {code_space}{code[1]}{Style.RESET_ALL} {count_space}{messages[code[0]]}"
             )
 
-    return sum(Counter(codes).values())
+    return sum(codes.values())
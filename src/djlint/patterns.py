@@ -0,0 +1,371 @@
+"""Compiled regex patterns used by the formatter and linter."""
+# pylint: disable=C0301
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import regex as re
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .settings import Config
+
+
+# regex syntax that ends a literal prefix.
+SPECIAL_CHARS = set(".^$*+?()[]|")
+
+
+def is_quantifier(pattern: str, index: int) -> bool:
+    """Check if the "{" at index starts a {m,n} quantifier."""
+    return bool(re.match(r"\{(?:\d+,?\d*|,\d+)\}", pattern[index:]))
+
+
+def has_top_level_alternation(pattern: str) -> bool:
+    """Check if a pattern has a "|" outside of any group or set."""
+    depth = 0
+    in_set = False
+    index = 0
+
+    while index < len(pattern):
+        char = pattern[index]
+
+        if char == "\\":
+            index += 1
+        elif in_set:
+            if char == "]":
+                in_set = False
+        elif char == "[":
+            in_set = True
+            # a "]" directly after "[" or "[^" is a literal
+            if pattern[index + 1 : index + 2] == "^":  # noqa:E203
+                index += 1
+            if pattern[index + 1 : index + 2] == "]":  # noqa:E203
+                index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+
+        index += 1
+
+    return False
+
+
+def required_literal(pattern: str, flags: int) -> Optional[str]:
+    """Get text that must be in a document for a pattern to match.
+
+    This is the literal text at the start of the pattern. None is
+    returned when there is no useful literal, or the pattern is too
+    complex to be sure.
+    """
+    if (
+        flags & re.VERBOSE
+        or re.search(r"\(\?[aiLmsux-]*[ix]", pattern)
+        or has_top_level_alternation(pattern)
+    ):
+        return None
+
+    literal = []
+    index = 1 if pattern.startswith("^") else 0
+
+    while index < len(pattern):
+        char = pattern[index]
+        step = 1
+
+        if char == "\\":
+            # only escaped punctuation is a literal, "\s", "\b" etc are not.
+            char = pattern[index + 1 : index + 2]  # noqa:E203
+            if not char or char.isalnum() or char == "_":
+                break
+            step = 2
+        elif char in SPECIAL_CHARS or (char == "{" and is_quantifier(pattern, index)):
+            break
+
+        index += step
+        following = pattern[index : index + 1]  # noqa:E203
+
+        # the last char is optional
+        if following in ("*", "?") or (
+            following == "{" and is_quantifier(pattern, index)
+        ):
+            break
+
+        literal.append(char)
+
+        if following == "+":
+            break
+
+    if len(literal) < 2:
+        return None
+
+    if flags & re.IGNORECASE:
+        return "".join(literal).casefold()
+
+    return "".join(literal)
+
+
+class Patterns:
+    """Compiled regex patterns for a Config.
+
+    Each pattern is compiled on first use and then reused for the life
+    of the process. Compiled patterns are dropped when the Config is
+    pickled, so each worker compiles its own.
+    """
+
+    def __init__(self, config: "Config") -> None:
+        """Set up an empty set of patterns for a Config."""
+        self._config = config
+        self._sources: Optional[Dict[str, Tuple[str, int]]] = None
+        self._compiled: Dict[Tuple[str, int], re.Pattern] = {}
+        self._literals: Dict[Tuple[str, int], Optional[str]] = {}
+
+    def __getstate__(self) -> Dict:
+        """Pickle only the Config, patterns are compiled again after."""
+        return {"_config": self._config}
+
+    def __setstate__(self, state: Dict) -> None:
+        """Unpickle with an empty set of patterns."""
+        self.__init__(state["_config"])  # type: ignore[misc]
+
+    def __getattr__(self, name: str) -> Any:
+        """Compile a named pattern on first use."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if self._sources is None:
+            self._sources = build_pattern_sources(self._config)
+
+        try:
+            pattern, flags = self._sources[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        compiled = self.get(pattern, flags)
+        # cache on the instance so later lookups skip __getattr__.
+        setattr(self, name, compiled)
+        return compiled
+
+    def literal(self, pattern: str, flags: int = 0) -> Optional[str]:
+        """Get the text a pattern needs to match, see required_literal."""
+        key = (pattern, flags)
+        try:
+            return self._literals[key]
+        except KeyError:
+            literal = self._literals[key] = required_literal(pattern, flags)
+            return literal
+
+    def get(self, pattern: str, flags: int = 0) -> re.Pattern:
+        """Compile a pattern that is not part of the named set."""
+        key = (pattern, flags)
+        try:
+            return self._compiled[key]
+        except KeyError:
+            compiled = self._compiled[key] = re.compile(pattern, flags)
+            return compiled
+
+
+def build_pattern_sources(config: "Config") -> Dict[str, Tuple[str, int]]:
+    """Build the source and flags of each named pattern from a Config."""
+    slt_html = config.indent_html_tags
+    always_self_closing_html = config.always_self_closing_html_tags
+    slt_template = config.optional_single_line_template_tags
+    break_char = config.break_before
+
+    line_contents = r"(.*?)"
+    trailing_contents = r"\n \t"
+
+    if config.preserve_blank_lines:
+        line_contents = r"([^\n]+?)"
+        trailing_contents = r" \t"
+
+    blank_line_after = "|".join(
+        x.strip() for x in (config.blank_line_after_tag or "").split(",")
+    )
+    blank_line_before = "|".join(
+        x.strip() for x in (config.blank_line_before_tag or "").split(",")
+    )
+
+    return {
+        # ignored blocks
+        "ignored_blocks": (
+            config.ignored_blocks,
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE | re.DOTALL,
+        ),
+        "ignored_inline_blocks": (
+            config.ignored_inline_blocks,
+            re.IGNORECASE | re.VERBOSE,
+        ),
+        "ignored_inline_and_blocks": (
+            config.ignored_inline_blocks + r" | " + config.ignored_blocks,
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE | re.DOTALL,
+        ),
+        "ignored_block_opening": (
+            config.ignored_block_opening,
+            re.IGNORECASE | re.VERBOSE,
+        ),
+        "ignored_block_closing": (
+            config.ignored_block_closing,
+            re.IGNORECASE | re.VERBOSE,
+        ),
+        "safe_closing_tag": (config.safe_closing_tag, re.IGNORECASE | re.VERBOSE),
+        "template_blocks": (
+            config.template_blocks,
+            re.DOTALL | re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        # linter
+        "html_tag": (
+            r"<(/?(\w+))\s*(" + config.attribute_pattern + r"|\s*)*\s*?>",
+            re.VERBOSE,
+        ),
+        "always_self_closing_html_tag": (
+            rf"^/?{config.always_self_closing_html_tags}\b",
+            re.I | re.X,
+        ),
+        # compress
+        "flatten_attributes": (
+            rf"(<(?:{config.indent_html_tags}))\s((?:\"[^\"]*\"|'[^']*'|{{{{(?:(?!}}}}).)*}}}}|{{%(?:(?!%}}).)*%}}|[^'\">{{}}])+)(/?>)",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        # expand
+        "break_html_tag_before": (
+            rf"{break_char}\K(</?(?:{config.break_html_tags})\b(\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])*>)",
+            re.IGNORECASE | re.VERBOSE,
+        ),
+        "break_html_tag_after": (
+            rf"(</?(?:{config.break_html_tags})\b(\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])*>)(?!\s*?\n)(?=[^\n])",
+            re.IGNORECASE | re.VERBOSE,
+        ),
+        "break_template_tag_before": (
+            break_char
+            + r"\K((?:{%|{{\#)[ ]*?(?:"
+            + config.break_template_tags
+            + ")[^}]+?[%|}]})",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        "break_template_tag_after": (
+            r"((?:{%|{{\#)[ ]*?(?:"
+            + config.break_template_tags
+            + ")[^}]+?[%|}]})(?=[^\n])",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        # html tag openings and the characters that start or end an attribute.
+        "html_tag_attribute_bounds": (
+            rf"<(?:{config.indent_html_tags})\b|[\"'{{}}>]",
+            re.VERBOSE,
+        ),
+        # condense
+        # a run of one of the tags. Each run holds a single tag name, so
+        # different tags next to each other are separate runs.
+        "blank_line_after_tags": (
+            rf"((?:{{%\s*?({blank_line_after})\b[^}}]+?%}}\n?)(?:{{%\s*?(?:\2)\b[^}}]+?%}}\n?)*)",
+            re.IGNORECASE | re.MULTILINE | re.DOTALL,
+        ),
+        "blank_line_before_tags": (
+            rf"(?<!^\n)((?:{{%\s*?({blank_line_before})\b[^}}]+?%}}\n?)(?:{{%\s*?(?:\2)\b[^}}]+?%}}\n?)*)",
+            re.IGNORECASE | re.MULTILINE | re.DOTALL,
+        ),
+        "has_blank_line_after_tag": (
+            rf"{{%\s*?(?:{blank_line_after})[^}}]+?%}}",
+            re.IGNORECASE | re.MULTILINE | re.DOTALL,
+        ),
+        "has_blank_line_before_tag": (
+            rf"{{%\s*?(?:{blank_line_before})[^}}]+?%}}",
+            re.IGNORECASE | re.MULTILINE | re.DOTALL,
+        ),
+        "leading_space": (
+            rf"^[ \t]*{line_contents}[{trailing_contents}]*$",
+            re.M,
+        ),
+        "leading_tag_space": (
+            rf"^[ \t]*((?:<|{{%|{{\#|{{{{).*?)[{trailing_contents}]*$",
+            re.M,
+        ),
+        "trailing_space": (rf"^{line_contents}[{trailing_contents}]*$", re.M),
+        "single_line_html_tag": (
+            rf"(<({config.optional_single_line_html_tags})\b(?:\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])*>)\s*([^<\n]*?)\s*?(</(\2)>)",
+            re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE,
+        ),
+        "single_line_template_tag": (
+            rf"({{%-?[ ]*?({config.optional_single_line_template_tags})[^\n(?:%}})]*?%}})\s*?([ ]*?[^%\n]*?[ ]*?)\s*?({{%-?[ ]+?end(\2)[ ]*?%}})",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        # indent
+        "ignored_inline_line": (
+            rf"^\s*?(?:{config.ignored_inline_blocks})",
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        "single_line_tags": (
+            rf"""^(?:[^<\s].*?)? # start of a line, optionally with some text
+                    (?:
+                        (?:<({slt_html})>)(?:.*?)(?:</(?:\1)>) # <span>stuff</span> >>>> match 1
+                       |(?:<({slt_html})\b[^>]+?>)(?:.*?)(?:</(?:\2)>) # <span stuff>stuff</span> >>> match 2
+                       |(?:<(?:{always_self_closing_html})\b[^>]*?/?>) # <img stuff />
+                       |(?:<(?:{slt_html})\b[^>]*?/>) # <img />
+                       |(?:{{%[ ]*?({slt_template})[ ]+?.*?%}})(?:.*?)(?:{{%[ ]+?end(?:\3)[ ]+?.*?%}}) # >>> match 3
+                       |{config.ignored_inline_blocks}
+                    )[ \t]*?
+                    (?:
+                    .*? # anything
+                    (?: # followed by another slt
+                        (?:<({slt_html})>)(?:.*?)(?:</(?:\4)>) # <span>stuff</span> >>>> match 1
+                       |(?:<({slt_html})\b[^>]+?>)(?:.*?)(?:</(?:\5)>) # <span stuff>stuff</span> >>> match 2
+                       |(?:<(?:{always_self_closing_html})\b[^>]*?/?>) # <img stuff />
+                       |(?:<(?:{slt_html})\b[^>]*?/>) # <img />
+                       |(?:{{%[ ]*?({slt_template})[ ]+?.*?%}})(?:.*?)(?:{{%[ ]+?end(?:\6)[ ]+?.*?%}}) # >>> match 3
+                       |{config.ignored_inline_blocks}
+                    )[ \t]*?
+                    )*? # optional of course
+                    [^<]*?$ # with no other tags following until end of line
+                """,
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        "tag_unindent": (
+            config.tag_unindent,
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        "ends_with_single_line_tag": (
+            rf"(<({slt_html})>)(.*?)(</(\2)>[^<]*?$)",
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        "ends_with_single_line_tag_attributes": (
+            rf"(<({slt_html})\\b[^>]+?>)(.*?)(</(\2)>[^<]*?$)",
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        "starts_with_single_line_tag": (
+            rf"(^<({slt_html})>)(.*?)(</(\2)>)",
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        "starts_with_single_line_tag_attributes": (
+            rf"(^<({slt_html})\b[^>]+?>)(.*?)(</(\2)>)",
+            re.IGNORECASE | re.VERBOSE | re.MULTILINE,
+        ),
+        "tag_unindent_line_start": (
+            r"^" + str(config.tag_unindent_line),
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        "tag_indent_line_start": (
+            r"^(?:" + str(config.tag_indent) + r")",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        "html_tag_attributes": (
+            rf"(\s*?)(<(?:{config.indent_html_tags})\b)((?:\"[^\"]*\"|'[^']*'|{{[^}}]*}}|[^'\">{{}}])+?)(/?>)",
+            re.VERBOSE | re.IGNORECASE,
+        ),
+        # attributes
+        "attribute_pattern": (config.attribute_pattern, re.VERBOSE),
+        "attribute_break_template_tag_before": (
+            break_char
+            + r".\K((?:{%|{{\#)[ ]*?(?:"
+            + config.break_template_tags
+            + ")[^}]+?[%|}]})",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        "attribute_break_template_tag_after": (
+            r"((?:{%|{{\#)[ ]*?(?:"
+            + config.break_template_tags
+            + ")[^}]+?[%|}]})([^\n]+)$",
+            re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+        ),
+        "template_indent": (config.template_indent, re.I | re.X),
+        "template_unindent": (config.template_unindent, re.I | re.X),
+        "tag_unindent_line": (config.tag_unindent_line, re.I | re.X),
+    }
@@ -5,33 +5,41 @@ Much code is borrowed from https://github.com/rareyman/HTMLBeautify, many thanks
 
 import difflib
 from pathlib import Path
+from typing import Optional
 
+from .cache import Cache
 from .formatter.compress import compress_html
 from .formatter.condense import condense_html
 from .formatter.css import format_css
 from .formatter.expand import expand_html
 from .formatter.indent import indent_html
 from .formatter.js import format_js
+from .helpers import RegionsCache
 from .settings import Config
 
 
-def reformat_file(config: Config, this_file: Path) -> dict:
+def reformat_file(
+    config: Config, this_file: Path, cache: Optional[Cache] = None
+) -> dict:
     """Reformat html file."""
     rawcode = this_file.read_text(encoding="utf8")
 
-    compressed = compress_html(rawcode, config)
+    cached = cache.get("format", this_file, rawcode) if cache else None
 
-    expanded = expand_html(compressed, config)
+    if cached is not None:
+        # unchanged files are cached without a copy of the code
+        beautified_code = cached["formatted"] or rawcode
 
-    condensed = condense_html(expanded, config)
+    else:
+        beautified_code = format_html(config, rawcode)
 
-    beautified_code = indent_html(condensed, config)
-
-    if config.format_css:
-        beautified_code = format_css(beautified_code, config)
-
-    if config.format_js:
-        beautified_code = format_js(beautified_code, config)
+        if cache:
+            cache.store(
+                "format",
+                this_file,
+                rawcode,
+                {"formatted": beautified_code if beautified_code != rawcode else None},
+            )
 
     if config.check is not True:
         # update the file
@@ -43,3 +51,25 @@ def reformat_file(config: Config, this_file: Path) -> dict:
         )
     }
     return out
+
+
+def format_html(config: Config, html: str) -> str:
+    """Reformat a block of html."""
+    # ignored regions are shared by the stages while the html is unchanged.
+    regions_cache = RegionsCache(config)
+
+    compressed = compress_html(html, config)
+
+    expanded = expand_html(compressed, config, regions_cache)
+
+    condensed = condense_html(expanded, config, regions_cache)
+
+    beautified_code = indent_html(condensed, config, regions_cache)
+
+    if config.format_css:
+        beautified_code = format_css(beautified_code, config)
+
+    if config.format_js:
+        beautified_code = format_js(beautified_code, config)
+
+    return beautified_code
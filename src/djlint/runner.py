@@ -0,0 +1,330 @@
+"""Run the linter and formatter over files or stdin."""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import click
+from click import echo
+from colorama import Fore, Style
+from tqdm import tqdm
+
+from .api import format_text, lint_text
+from .cache import Cache
+from .lint import lint_file
+from .output import print_results, print_summary, sort_results
+from .reformat import reformat_file
+from .settings import Config
+from .src import get_src, has_pragma
+
+# runs with less than this many bytes are done in process, as starting
+# worker processes takes longer than the run.
+IN_PROCESS_SIZE = 64 * 1024
+
+# files are sent to workers in chunks of up to this many bytes.
+MAX_CHUNK_SIZE = 1024 * 1024
+
+# the cost of a file beyond its size, in bytes. Stops chunks of empty
+# files from growing without limit.
+FILE_OVERHEAD = 1024
+
+
+def build_config(src: List[str], **options: Any) -> Config:
+    """Build a Config from command line options."""
+    return Config(
+        src[0],
+        extension=options["extension"],
+        ignore=options["ignore"],
+        indent=options["indent"],
+        quiet=options["quiet"],
+        profile=options["profile"],
+        require_pragma=options["require_pragma"],
+        lint=options["lint"] or not (options["reformat"] or options["check"]),
+        reformat=options["reformat"],
+        check=options["check"],
+        use_gitignore=options["use_gitignore"],
+        warn=options["warn"],
+        preserve_leading_space=options["preserve_leading_space"],
+        preserve_blank_lines=options["preserve_blank_lines"],
+        format_css=options["format_css"],
+        format_js=options["format_js"],
+        configuration=options["configuration"],
+        statistics=options["statistics"],
+        no_cache=options["no_cache"],
+        jobs=options["jobs"],
+        stream=options["stream"],
+        stream_in_order=options["stream_in_order"],
+        changed_since=options["changed_since"],
+        staged=options["staged"],
+    )
+
+
+def run(config: Config, src: List[str]) -> int:
+    """Lint and format files. Returns the number of files with errors."""
+    if "-" in src:
+        if not config.files:
+            return run_stdin(config)
+
+        file_list = get_src([Path(x) for x in config.files], config)
+
+    else:
+        file_list = get_src([Path(x) for x in src], config)
+
+    if len(file_list) == 0:
+        return 0
+
+    message = ""
+
+    if config.check is True:
+        message = "Checking"
+    elif config.reformat is True:
+        message = "Reformatting"
+
+    if config.lint:
+        if message != "":
+            message += " and "
+        message += "Linting"
+
+    # pylint: disable=C0209
+    bar_message = (
+        "{}{}{} {}{{n_fmt}}/{{total_fmt}}{} {}files{} {{bar}} {}{{elapsed}}{}".format(
+            Fore.BLUE + Style.BRIGHT,
+            message,
+            Style.RESET_ALL,
+            Fore.RED + Style.BRIGHT,
+            Style.RESET_ALL,
+            Fore.BLUE + Style.BRIGHT,
+            Style.RESET_ALL,
+            Fore.GREEN + Style.BRIGHT,
+            Style.RESET_ALL + "    ",
+        )
+    )
+    if config.stdin is False and config.quiet is False:
+        echo()
+
+    worker_count = max(1, min(config.jobs or os.cpu_count() or 1, len(file_list)))
+
+    progress_char = "┈━"
+
+    if sys.platform == "win32":
+        # Work around https://bugs.python.org/issue26903
+        worker_count = min(worker_count, 60)
+        progress_char = " »"
+
+    cache = Cache(config) if config.cache else None
+
+    results = run_files(config, cache, file_list, worker_count)
+    file_errors = []
+    totals = None
+
+    if config.stream:
+        # results are printed as each file is done, which also shows progress.
+        if config.stream_in_order:
+            results = in_order(results, file_list)
+
+        totals = print_results(config, (result for _, result in results))
+
+    else:
+        elapsed = "00:00"
+        with tqdm(
+            total=len(file_list),
+            bar_format=bar_message,
+            colour="BLUE",
+            ascii=progress_char,
+            leave=False,
+        ) as pbar:
+
+            for _, result in results:
+
+                file_errors.append(result)
+                pbar.update()
+                elapsed = pbar.format_interval(pbar.format_dict["elapsed"])
+
+        finished_bar_message = (
+            "{}{}{} {}{{n_fmt}}/{{total_fmt}}{} {}files{} {{bar}} {}{}{}    ".format(
+                Fore.BLUE + Style.BRIGHT,
+                message,
+                Style.RESET_ALL,
+                Fore.GREEN + Style.BRIGHT,
+                Style.RESET_ALL,
+                Fore.BLUE + Style.BRIGHT,
+                Style.RESET_ALL,
+                Fore.GREEN + Style.BRIGHT,
+                elapsed,
+                Style.RESET_ALL,
+            )
+        )
+
+        finished_bar = tqdm(
+            total=len(file_list),
+            initial=len(file_list),
+            bar_format=finished_bar_message,
+            colour="GREEN",
+            ascii=progress_char,
+            leave=True,
+        )
+        finished_bar.close()
+
+    if cache:
+        cache.prune()
+
+    if totals is None:
+        totals = print_results(config, sort_results(file_errors))
+
+    return print_summary(config, totals, len(file_list))
+
+
+def run_stdin(config: Config) -> int:
+    """Lint and format stdin. Returns the number of errors.
+
+    The text is checked in process and never written to disk. When
+    formatting, only the code is given back.
+    """
+    stdin_text = click.get_text_stream("stdin", encoding="utf8").read()
+
+    if config.require_pragma and not has_pragma(config, stdin_text):
+        echo(Fore.BLUE + "No files to check! 😢")
+        return 0
+
+    # as with files, --check leaves the code unchanged, and --reformat
+    # changes it before it is linted.
+    code = stdin_text
+    if config.reformat and not config.check:
+        code = format_text(stdin_text, config).formatted
+
+    if config.reformat or config.check:
+        echo(code.rstrip().encode("utf8"))
+
+    file_errors = []
+    if config.lint:
+        file_errors.append({"lint_message": {"-": lint_text(code, config)}})
+
+    return print_summary(config, print_results(config, file_errors), 1)
+
+
+def build_chunks(
+    file_list: List[Path], sizes: List[int], worker_count: int
+) -> List[List[Path]]:
+    """Split files into chunks of about the same number of bytes.
+
+    Chunks are kept small enough that each worker gets several, so one
+    slow chunk does not hold up the run.
+    """
+    chunk_size = min(MAX_CHUNK_SIZE, sum(sizes) // (worker_count * 4) + 1)
+    chunks: List[List[Path]] = []
+    chunk: List[Path] = []
+    chunk_bytes = 0
+
+    for this_file, size in zip(file_list, sizes):
+        chunk.append(this_file)
+        chunk_bytes += size
+
+        if chunk_bytes >= chunk_size:
+            chunks.append(chunk)
+            chunk = []
+            chunk_bytes = 0
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def run_files(
+    config: Config, cache: Optional[Cache], file_list: List[Path], worker_count: int
+) -> Iterator[Tuple[int, Dict]]:
+    """Run linter or formatter on files.
+
+    Gives the index of each file in file_list and its result, as each
+    file finishes.
+    """
+    sizes = []
+    for this_file in file_list:
+        try:
+            sizes.append(this_file.stat().st_size + FILE_OVERHEAD)
+        except OSError:
+            sizes.append(FILE_OVERHEAD)
+
+    if worker_count == 1 or sum(sizes) < IN_PROCESS_SIZE:
+        for index, this_file in enumerate(file_list):
+            yield index, process(config, cache, this_file)
+        return
+
+    # the largest files are started first, so a large file near the end of
+    # the list does not leave the other workers waiting on it.
+    by_size = sorted(range(len(file_list)), key=lambda x: sizes[x], reverse=True)
+    chunks = build_chunks(
+        [file_list[index] for index in by_size],
+        [sizes[index] for index in by_size],
+        worker_count,
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=min(worker_count, len(chunks)),
+        initializer=init_worker,
+        initargs=(config, cache),
+    ) as exe:
+        futures = {}
+        start = 0
+        for chunk in chunks:
+            end = start + len(chunk)
+            futures[exe.submit(process_chunk, chunk)] = by_size[start:end]
+            start = end
+
+        for future in as_completed(futures):
+            yield from zip(futures[future], future.result())
+
+
+def in_order(
+    results: Iterator[Tuple[int, Dict]], file_list: List[Path]
+) -> Iterator[Tuple[int, Dict]]:
+    """Put results in file name order.
+
+    Results that finish early are held until the results before them are
+    done.
+    """
+    order = sorted(range(len(file_list)), key=lambda x: str(file_list[x]))
+    waiting: Dict[int, Dict] = {}
+    position = 0
+
+    for index, result in results:
+        waiting[index] = result
+
+        while position < len(order) and order[position] in waiting:
+            yield order[position], waiting.pop(order[position])
+            position += 1
+
+
+# settings for the files run in a worker process. They are set once when
+# the worker starts instead of being sent with every file.
+worker_config: Optional[Config] = None
+worker_cache: Optional[Cache] = None
+
+
+def init_worker(config: Config, cache: Optional[Cache]) -> None:
+    """Set the settings used by process_chunk in a worker."""
+    # pylint: disable=W0603
+    global worker_config, worker_cache
+    worker_config = config
+    worker_cache = cache
+
+
+def process_chunk(chunk: List[Path]) -> List[Dict]:
+    """Run linter or formatter on a chunk of files in a worker."""
+    return [
+        process(worker_config, worker_cache, this_file)  # type: ignore[arg-type]
+        for this_file in chunk
+    ]
+
+
+def process(config: Config, cache: Optional[Cache], this_file: Path) -> Dict:
+    """Run linter or formatter."""
+    output = {}
+    if config.reformat or config.check:
+        output["format_message"] = reformat_file(config, this_file, cache)
+
+    if config.lint:
+        output["lint_message"] = lint_file(config, this_file, cache)
+
+    return output
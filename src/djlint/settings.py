@@ -3,12 +3,17 @@
 # flake8: noqa
 
 
+import hashlib
 import json
 import logging
+import os
+import sys
+import tempfile
+from functools import lru_cache
 
 ## get pyproject.toml settings
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import yaml
 from click import echo
@@ -23,8 +28,13 @@ try:
 except ImportError:
     import tomli as tomllib  # type: ignore
 
+from .patterns import Patterns
+
 logger = logging.getLogger(__name__)
 
+# the C loader is much faster, but is only there when pyyaml is built with libyaml.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def find_project_root(src: Path) -> Path:
     """Attempt to get the project root."""
@@ -46,6 +56,30 @@ def find_project_root(src: Path) -> Path:
     return directory
 
 
+def settings_stamps(
+    root: Path, configuration: Optional[str] = None
+) -> List[Tuple[str, int, int]]:
+    """Get the path, modified time and size of a project's settings files."""
+    files = [
+        root / "pyproject.toml",
+        root / ".djlintrc",
+        root / ".djlint_rules.yaml",
+        root / ".gitignore",
+    ]
+    if configuration:
+        files.append(Path(configuration))
+
+    stamps = []
+    for settings_file in files:
+        try:
+            stat = settings_file.stat()
+        except OSError:
+            continue
+        stamps.append((str(settings_file), stat.st_mtime_ns, stat.st_size))
+
+    return stamps
+
+
 def load_gitignore(root: Path) -> PathSpec:
     """Search upstream for a .gitignore file."""
 
@@ -96,6 +130,28 @@ def find_djlint_rules(root: Path) -> Optional[Path]:
     return None
 
 
+def find_cache_dir(root: Path, cache_dir: Optional[str]) -> Path:
+    """Get the folder used to cache results.
+
+    DJLINT_CACHE_DIR takes precedence, then the cache_dir setting (relative
+    to the project root), then the user cache folder.
+    """
+    if os.environ.get("DJLINT_CACHE_DIR"):
+        return Path(os.environ["DJLINT_CACHE_DIR"])
+
+    if cache_dir:
+        return root / cache_dir
+
+    if sys.platform == "win32":
+        user_cache = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData"))
+    elif sys.platform == "darwin":
+        user_cache = Path.home() / "Library" / "Caches"
+    else:
+        user_cache = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+
+    return user_cache / "djlint"
+
+
 def load_project_settings(src: Path, config: Optional[str]) -> Dict:
     """Load djlint config from pyproject.toml."""
 
@@ -154,6 +210,11 @@ def validate_rules(rules: List) -> List:
         if "message" not in rule["rule"]:
             warning += 1
             echo(Fore.RED + f"Warning: Rule {name} is missing a message! 😢")
+        if not isinstance(rule["rule"].get("requires", []), list) or not all(
+            isinstance(x, str) for x in rule["rule"].get("requires", [])
+        ):
+            warning += 1
+            echo(Fore.RED + f"Warning: Rule {name} requires should be a list! 😢")
 
         if warning == 0:
             clean_rules.append(rule)
@@ -161,17 +222,73 @@ def validate_rules(rules: List) -> List:
     return clean_rules
 
 
-def load_custom_rules(src: Path) -> List:
+@lru_cache(maxsize=None)
+def read_rules(
+    rules_file: Path, modified: int, size: int, cache_dir: Optional[Path]
+) -> Optional[str]:
+    """Read a rules file as json text.
+
+    Parsing yaml is slow, so the parsed rules are saved in cache_dir as
+    json, keyed on the file path, modified time and size. None is
+    returned for rules that json cannot hold.
+    """
+    cached_rules = None
+    if cache_dir:
+        key = hashlib.sha256(
+            f"{rules_file.resolve()}\0{modified}\0{size}\0{yaml.__version__}".encode(
+                "utf8"
+            )
+        ).hexdigest()
+        cached_rules = cache_dir / f"rules-{key}.json"
+
+        try:
+            return cached_rules.read_text(encoding="utf8")
+        except OSError:
+            pass
+
+    rules = yaml.load(rules_file.read_text(encoding="utf8"), Loader=YamlLoader)
+    try:
+        rules_json = json.dumps(rules)
+    except (TypeError, ValueError):
+        return None
+
+    if json.loads(rules_json) != rules:
+        return None
+
+    if cached_rules:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)  # type: ignore[union-attr]
+            with tempfile.NamedTemporaryFile(
+                "w", dir=cache_dir, delete=False, encoding="utf8"
+            ) as temp_file:
+                temp_file.write(rules_json)
+            os.replace(temp_file.name, cached_rules)
+        except OSError:
+            pass
+
+    return rules_json
+
+
+def load_rules(rules_file: Path, cache_dir: Optional[Path] = None) -> Any:
+    """Load linter rules from a yaml file."""
+    stat = rules_file.stat()
+    rules_json = read_rules(rules_file, stat.st_mtime_ns, stat.st_size, cache_dir)
+
+    if rules_json is None:
+        # rules that do not survive json, like dates, are parsed every time.
+        return yaml.load(rules_file.read_text(encoding="utf8"), Loader=YamlLoader)
+
+    return json.loads(rules_json)
+
+
+def load_custom_rules(src: Path, cache_dir: Optional[Path] = None) -> List:
     """Load djlint config from pyproject.toml."""
 
     djlint_content: List = []
     djlint_rules_file = find_djlint_rules(src)
 
     if djlint_rules_file:
-        djlint_content = yaml.load(
-            Path(djlint_rules_file).read_text(encoding="utf8"),
-            Loader=yaml.SafeLoader,
-        )
+        djlint_content = load_rules(djlint_rules_file, cache_dir)
 
     return djlint_content
 
@@ -183,6 +300,19 @@ def build_custom_blocks(custom_blocks: Union[str, None]) -> Optional[str]:
     return None
 
 
+def build_extensions(extensions: Union[str, List[str]]) -> List[str]:
+    """Build list of file extensions from a list or comma separated string."""
+    if isinstance(extensions, str):
+        extensions = extensions.split(",")
+
+    # remove leading . from extension
+    return [
+        x.strip()[1:] if x.strip().startswith(".") else x.strip()
+        for x in extensions
+        if x.strip()
+    ]
+
+
 def build_custom_html(custom_html: Union[str, None]) -> Optional[str]:
     """Build regex string for custom HTML blocks."""
     if custom_html:
@@ -213,6 +343,12 @@ class Config:
         format_js: bool = False,
         configuration: Optional[str] = None,
         statistics: bool = False,
+        no_cache: bool = False,
+        jobs: Optional[int] = None,
+        stream: bool = False,
+        stream_in_order: bool = False,
+        changed_since: Optional[str] = None,
+        staged: bool = False,
     ):
 
         self.reformat = reformat
@@ -233,7 +369,10 @@ class Config:
         self.use_gitignore: bool = use_gitignore or djlint_settings.get(
             "use_gitignore", False
         )
-        self.extension: str = str(extension or djlint_settings.get("extension", "html"))
+        extensions: Union[str, List[str]] = (
+            extension or djlint_settings.get("extension") or "html"
+        )
+        self.extensions: List[str] = build_extensions(extensions) or ["html"]
         self.quiet: bool = quiet or djlint_settings.get("quiet", False)
         self.require_pragma: bool = (
             require_pragma
@@ -296,13 +435,40 @@ class Config:
             "linter_output_format", "{code} {line} {message} {match}"
         )
 
+        # results are cached by file contents and settings
+        self.cache: bool = not no_cache and djlint_settings.get("cache", True)
+        self.cache_dir: Path = find_cache_dir(
+            self.project_root, djlint_settings.get("cache_dir")
+        )
+
+        # print results as each file is done, optionally in file name order.
+        self.stream_in_order: bool = stream_in_order or djlint_settings.get(
+            "stream_in_order", False
+        )
+        self.stream: bool = (
+            stream or self.stream_in_order or djlint_settings.get("stream", False)
+        )
+
+        # number of worker processes, defaults to the number of cpus.
+        self.jobs: Optional[int] = jobs
+
+        # only check files changed in git since a revision, or staged.
+        self.changed_since: Optional[str] = changed_since
+        self.staged: bool = staged
+
+        try:
+            self.jobs = jobs or int(djlint_settings.get("jobs", 0)) or None
+        except ValueError:
+            echo(
+                Fore.RED
+                + f"Error: Invalid pyproject.toml jobs value {djlint_settings['jobs']}"
+            )
+
         # load linter rules
+        rules_cache_dir = self.cache_dir if self.cache else None
         rule_set = validate_rules(
-            yaml.load(
-                (Path(__file__).parent / "rules.yaml").read_text(encoding="utf8"),
-                Loader=yaml.SafeLoader,
-            )
-            + load_custom_rules(self.project_root)
+            load_rules(Path(__file__).parent / "rules.yaml", rules_cache_dir)
+            + load_custom_rules(self.project_root, rules_cache_dir)
         )
 
         self.linter_rules = list(
@@ -640,9 +806,9 @@ class Config:
             | {{-?\s*/\*\s*djlint\:off\s*\*/\s*-?}}.*?(?={{-?\s*/\*\s*djlint\:on\s*\*/\s*-?}})
             | <!--.*?-->
             | <\?php.*?\?>
-            | {%[ ]*?blocktranslate\b[^(?:%})]*?%}.*?{%[ ]*?endblocktranslate[ ]*?%}
-            | {%[ ]*?blocktrans\b[^(?:%})]*?%}.*?{%[ ]*?endblocktrans[ ]*?%}
-            | {%[ ]*?comment\b[^(?:%})]*?%}.*?(?={%[ ]*?endcomment[ ]*?%})
+            | {%[ ]*blocktranslate\b[^(?:%})]*?%}.*?{%[ ]*endblocktranslate[ ]*%}
+            | {%[ ]*blocktrans\b[^(?:%})]*?%}.*?{%[ ]*endblocktrans[ ]*%}
+            | {%[ ]*comment\b[^(?:%})]*?%}.*?(?={%[ ]*endcomment[ ]*%})
             | ^---[\s\S]+?---
         """
 
@@ -665,9 +831,9 @@ class Config:
             | {\*.*?\*}
             | {\#(?!.*djlint:[ ]*?(?:off|on)\b).*\#}
             | <\?php.*?\?>
-            | {%[ ]*?comment\b[^(?:%})]*?%}.*?{%[ ]*?endcomment[ ]*?%}
-            | {%[ ]*?blocktranslate\b[^(?:%})]*?%}.*?{%[ ]*?endblocktranslate[ ]*?%}
-            | {%[ ]*?blocktrans\b[^(?:%})]*?%}.*?{%[ ]*?endblocktrans[ ]*?%}
+            | {%[ ]*comment\b[^(?:%})]*?%}.*?{%[ ]*endcomment[ ]*%}
+            | {%[ ]*blocktranslate\b[^(?:%})]*?%}.*?{%[ ]*endblocktranslate[ ]*%}
+            | {%[ ]*blocktrans\b[^(?:%})]*?%}.*?{%[ ]*endblocktrans[ ]*%}
         """
 
         self.optional_single_line_html_tags: str = r"""
@@ -804,3 +970,10 @@ class Config:
               )
         """
         )
+
+        self.patterns = Patterns(self)
+
+    @property
+    def extension(self) -> str:
+        """Get the first file extension, for code written before extensions."""
+        return self.extensions[0]
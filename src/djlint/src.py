@@ -1,13 +1,21 @@
 """Build src file list."""
+import fnmatch
+import os
 import re
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import suppress
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Set, Tuple
 
-from click import echo
+from click import ClickException, UsageError, echo
 from colorama import Fore
 
 from .settings import Config
 
+# threads used to read folders when finding files.
+WALK_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
 
 def get_src(src: List[Path], config: Config) -> List[Path]:
     """Get source files."""
@@ -17,8 +25,18 @@ def get_src(src: List[Path], config: Config) -> List[Path]:
 
         normalized_item = item.resolve()
 
+        changed = (
+            changed_files(
+                normalized_item if normalized_item.is_dir() else normalized_item.parent,
+                config,
+            )
+            if config.changed_since or config.staged
+            else None
+        )
+
         if (
             Path.is_file(normalized_item)
+            and (changed is None or normalized_item in changed)
             and no_pragma(config, normalized_item)
             and (
                 (
@@ -31,19 +49,10 @@ def get_src(src: List[Path], config: Config) -> List[Path]:
             paths.append(normalized_item)
             continue
 
-        # remove leading . from extension
-        extension = str(config.extension)
-        extension = extension[1:] if extension.startswith(".") else extension
-
         paths.extend(
             filter(
-                lambda x: not re.search(config.exclude, x.as_posix(), re.VERBOSE)
-                and no_pragma(config, x)
-                and (
-                    (config.use_gitignore and not config.gitignore.match_file(x))
-                    or not config.use_gitignore
-                ),
-                list(normalized_item.glob(f"**/*.{extension}")),
+                lambda x: no_pragma(config, x),
+                walk(normalized_item, config, only=changed),
             )
         )
 
@@ -53,6 +62,141 @@ def get_src(src: List[Path], config: Config) -> List[Path]:
     return paths
 
 
+def changed_files(folder: Path, config: Config) -> Set[Path]:
+    """Get the files in a folder changed in git.
+
+    Files changed since config.changed_since, or staged, or both are
+    found with git diff. Deleted files are left out.
+    """
+    args = ["git", "diff", "--name-only", "-z", "--relative", "--diff-filter=d"]
+
+    if config.staged:
+        args.append("--cached")
+
+    if config.changed_since:
+        if config.changed_since.startswith("-"):
+            raise UsageError(f"Invalid revision: {config.changed_since}")
+        args.append(config.changed_since)
+
+    try:
+        result = subprocess.run(
+            [*args, "--"], cwd=folder, capture_output=True, check=False
+        )
+    except OSError as error:
+        raise ClickException(f"Could not run git: {error}") from error
+
+    if result.returncode != 0:
+        raise ClickException(
+            "Could not get changed files from git: "
+            + os.fsdecode(result.stderr).strip()
+        )
+
+    return {folder / os.fsdecode(name) for name in result.stdout.split(b"\0") if name}
+
+
+def walk(
+    root: Path,
+    config: Config,
+    threads: int = WALK_THREADS,
+    only: Optional[Set[Path]] = None,
+) -> List[Path]:
+    """Find the files in a folder with the extensions to check.
+
+    Folders that are excluded, or ignored by git, are skipped without
+    being read. Folders are read in threads, as reading them is mostly
+    waiting on the file system. When only is given, only those files are
+    found and only the folders holding them are read.
+    """
+    # all extensions are matched in one pass over each folder.
+    file_name = re.compile(
+        "|".join(
+            fnmatch.translate(os.path.normcase(f"*.{extension}"))
+            for extension in config.extensions
+        )
+    )
+
+    exclude = re.compile(config.exclude, re.VERBOSE)
+    gitignore = config.gitignore if config.use_gitignore else None
+
+    # an exclude pattern found in a folder path is also found in the path of
+    # each file in it, unless a lookahead sees past the folder name. In git, a
+    # file cannot be added back if its folder is ignored, but pathspec checks
+    # files on their own.
+    prune_excluded = not re.search(r"\(\?<?[=!]", config.exclude)
+    prune_ignored = (
+        gitignore
+        if gitignore is not None
+        and all(pattern.include is not False for pattern in gitignore.patterns)
+        else None
+    )
+
+    only_folders = (
+        {str(parent) for path in only for parent in path.parents}
+        if only is not None
+        else None
+    )
+
+    def scan(folder: str) -> Tuple[List[Path], List[str]]:
+        files: List[Path] = []
+        folders: List[str] = []
+
+        with suppress(OSError), os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        folder_path = entry.path.replace(os.sep, "/") + "/"
+                        if not (
+                            only_folders is not None and entry.path not in only_folders
+                        ) and not (
+                            (prune_excluded and exclude.search(folder_path))
+                            or (
+                                prune_ignored is not None
+                                and prune_ignored.match_file(folder_path)
+                            )
+                        ):
+                            folders.append(entry.path)
+
+                    elif (
+                        file_name.match(os.path.normcase(entry.name))
+                        and entry.is_file()
+                    ):
+                        path = Path(entry.path)
+                        if (
+                            (only is None or path in only)
+                            and not exclude.search(path.as_posix())
+                            and not (gitignore and gitignore.match_file(path))
+                        ):
+                            files.append(path)
+
+                except OSError:
+                    continue
+
+        return files, folders
+
+    paths: List[Path] = []
+
+    if threads == 1:
+        folders = [str(root)]
+        while folders:
+            files, found = scan(folders.pop())
+            paths.extend(files)
+            folders.extend(found)
+
+        return paths
+
+    with ThreadPoolExecutor(max_workers=threads) as exe:
+        pending = {exe.submit(scan, str(root))}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, folders = future.result()
+                paths.extend(files)
+                pending.update(exe.submit(scan, folder) for folder in folders)
+
+    return paths
+
+
 html_patterns = [re.compile(r"<!--\s*djlint\:on\s*-->")]
 django_jinja_patterns = [
     re.compile(r"\{#\s*djlint\:on\s*#\}"),
@@ -69,23 +213,28 @@ def no_pragma(config: Config, this_file: Path) -> bool:
         return True
 
     with this_file.open(encoding="utf8") as open_file:
-        first_line = open_file.readline()
-
-        pragma_patterns = {
-            "html": html_patterns,
-            "django": django_jinja_patterns + html_patterns,
-            "jinja": django_jinja_patterns + html_patterns,
-            "nunjucks": nunjucks_patterns + html_patterns,
-            "handlebars": handlebars_patterns + html_patterns,
-            "golang": golang_patterns + html_patterns,
-            "angular": html_patterns,
-            "all": django_jinja_patterns
-            + nunjucks_patterns
-            + handlebars_patterns
-            + golang_patterns
-            + html_patterns,
-        }
-
-        return any(
-            re.match(pattern, first_line) for pattern in pragma_patterns[config.profile]
-        )
+        return has_pragma(config, open_file.readline())
+
+
+def has_pragma(config: Config, html: str) -> bool:
+    """Check if html starts with a djlint:on comment for the profile."""
+    pragma_patterns = {
+        "html": html_patterns,
+        "django": django_jinja_patterns + html_patterns,
+        "jinja": django_jinja_patterns + html_patterns,
+        "nunjucks": nunjucks_patterns + html_patterns,
+        "handlebars": handlebars_patterns + html_patterns,
+        "golang": golang_patterns + html_patterns,
+        "angular": html_patterns,
+        "all": django_jinja_patterns
+        + nunjucks_patterns
+        + handlebars_patterns
+        + golang_patterns
+        + html_patterns,
+    }
+
+    first_line = html.split("\n", 1)[0]
+
+    return any(
+        re.match(pattern, first_line) for pattern in pragma_patterns[config.profile]
+    )
@@ -0,0 +1,115 @@
+"""Thin client for the djLint daemon.
+
+Sends the arguments, working folder and stdin of a run to a daemon
+started with ``djlint --daemon`` and prints what it sends back. Only the
+standard library is imported, so the client starts quickly. If no daemon
+is running, or the socket is not in a folder only the user can use,
+djLint is run directly.
+
+run::
+
+   djlint-client templates/ --check
+"""
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def socket_path() -> Path:
+    """Get the path of the daemon socket, as djlint.daemon.socket_path does."""
+    if os.environ.get("DJLINT_SOCKET"):
+        return Path(os.environ["DJLINT_SOCKET"])
+
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "djlint.sock"
+
+    return Path(tempfile.gettempdir()) / f"djlint-{os.getuid()}" / "djlint.sock"
+
+
+def is_private(folder: Path) -> bool:
+    """Check that a folder is owned by the user and closed to everyone else.
+
+    Anyone who can put a socket in the folder gets the arguments and
+    stdin of every run, so a symlink or a folder another user made is
+    not used.
+    """
+    try:
+        info = folder.lstat()
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and stat.S_IMODE(info.st_mode) == 0o700
+    )
+
+
+def send(request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send a request to the daemon.
+
+    Returns None if it is not running, or its socket folder is not private.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    path = socket_path()
+    if not is_private(path.parent):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(str(path))
+            client.sendall(json.dumps(request).encode("utf8") + b"\n")
+            client.shutdown(socket.SHUT_WR)
+
+            response = b""
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+
+    except OSError:
+        return None
+
+    return json.loads(response)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """Run djLint through the daemon."""
+    args = sys.argv[1:] if args is None else args
+    request: Dict[str, Any] = {
+        "args": args,
+        "cwd": os.getcwd(),
+        "tty": sys.stdout.isatty(),
+    }
+    if "-" in args:
+        request["stdin"] = sys.stdin.read()
+
+    response = send(request)
+
+    if response is None:
+        # pylint: disable=C0415
+        from djlint import main as djlint
+
+        if "-" in args:
+            sys.stdin = io.TextIOWrapper(
+                io.BytesIO(request["stdin"].encode("utf8")), encoding="utf8"
+            )
+        djlint(args, prog_name="djlint")  # pylint: disable=E1120
+        return
+
+    sys.stderr.write(response["stderr"])
+    sys.stdout.write(response["stdout"])
+    sys.exit(response["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,16 @@ from click.testing import CliRunner
 from src.djlint import main as djlint
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Keep cached results of each test out of the user cache folder."""
+    folder = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("DJLINT_CACHE_DIR", str(folder))
+    return folder
+
+
 @pytest.fixture()
 def runner() -> CliRunner:
     """Click runner for djlint tests."""
@@ -0,0 +1,61 @@
+"""Djlint tests specific to the python api.
+
+run::
+
+   pytest tests/test_config/test_api/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_api/test_config.py::test_lint_text --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+from pathlib import Path
+
+from src.djlint.api import format_text, lint_text
+from src.djlint.lint import LintError
+from src.djlint.settings import Config
+
+
+def test_lint_text(tmp_path: Path) -> None:
+    config = Config(str(tmp_path))
+
+    assert lint_text("<div></span>", config) == [
+        LintError("H025", 1, 0, "<div>", "Tag seems to be an orphan."),
+        LintError("H025", 1, 5, "</span>", "Tag seems to be an orphan."),
+    ]
+    assert lint_text("<div><p>text</p></div>", config) == []
+
+    # per file ignores need the path of the text
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.djlint]\nper-file-ignores={"ignored.html"="H025"}', encoding="utf8"
+    )
+    config = Config(str(tmp_path))
+    assert len(lint_text("<div></span>", config)) == 2
+    assert lint_text("<div></span>", config, "templates/ignored.html") == []
+
+    config = Config(str(tmp_path), require_pragma=True)
+    assert lint_text("<div></span>", config) == []
+    assert len(lint_text("<!-- djlint:on -->\n<div></span>", config)) == 2
+
+
+def test_format_text(tmp_path: Path) -> None:
+    config = Config(str(tmp_path))
+
+    result = format_text("<div><p>text</p></div>", config)
+    assert result.formatted == "<div>\n    <p>text</p>\n</div>\n"
+    assert result.changed is True
+    assert "+    <p>text</p>" in result.diff
+
+    result = format_text(result.formatted, config)
+    assert result.changed is False
+    assert not result.diff
+
+    config = Config(str(tmp_path), require_pragma=True)
+    assert format_text("<div><p>text</p></div>", config).changed is False
+    assert (
+        format_text("<!-- djlint:on -->\n<div><p>text</p></div>", config).formatted
+        == "<!-- djlint:on -->\n<div>\n    <p>text</p>\n</div>\n"
+    )
@@ -142,3 +142,21 @@ def test_blank_lines_after_tag_ten(runner: CliRunner) -> None:
         ],
     )
     assert result.exit_code == 0
+
+
+def test_blank_lines_after_tag_eleven(runner: CliRunner) -> None:
+    # a blank line is added after each run of tags, whatever the tags before it.
+    result = runner.invoke(
+        djlint,
+        [
+            "tests/test_config/test_blank_lines_after_tag/html_eleven.html",
+            "--check",
+        ],
+    )
+    assert (
+        """+{% endblock %}
++
++<p></p>"""
+        in result.output
+    )
+    assert result.exit_code == 1
@@ -0,0 +1,177 @@
+"""Djlint tests specific to the result cache.
+
+run::
+
+   pytest tests/test_config/test_cache/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_cache/test_config.py::test_lint_cache --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+import json
+import os
+from pathlib import Path
+from typing import Set, TextIO
+
+import pytest
+from click.testing import CliRunner
+
+from src.djlint import cache as djlint_cache
+from src.djlint import main as djlint
+from src.djlint.settings import Config
+from tests.conftest import write_to_file
+
+
+def test_lint_cache(runner: CliRunner, tmp_file: TextIO, tmp_path: Path) -> None:
+    env = {"DJLINT_CACHE_DIR": str(tmp_path)}
+    write_to_file(tmp_file.name, b"<div></span>")
+
+    result = runner.invoke(djlint, [tmp_file.name, "--lint"], env=env)
+    assert result.exit_code == 1
+    assert "H025" in result.output
+
+    entries = list(tmp_path.glob("*/*"))
+    assert len(entries) == 1
+
+    # a cached result is used instead of linting the file again
+    entries[0].write_text(json.dumps({"errors": []}), encoding="utf8")
+    result = runner.invoke(djlint, [tmp_file.name, "--lint"], env=env)
+    assert result.exit_code == 0
+
+    result = runner.invoke(djlint, [tmp_file.name, "--lint", "--no-cache"], env=env)
+    assert result.exit_code == 1
+
+    # changing the file or the settings misses the cache
+    write_to_file(tmp_file.name, b"<div></span> ")
+    result = runner.invoke(djlint, [tmp_file.name, "--lint"], env=env)
+    assert result.exit_code == 1
+
+    result = runner.invoke(
+        djlint, [tmp_file.name, "--lint", "--profile", "django"], env=env
+    )
+    assert result.exit_code == 1
+    assert len(list(tmp_path.glob("*/*"))) == 3
+
+
+def test_format_cache(runner: CliRunner, tmp_file: TextIO, tmp_path: Path) -> None:
+    env = {"DJLINT_CACHE_DIR": str(tmp_path)}
+    write_to_file(tmp_file.name, b"<div><p>nice stuff here</p></div>")
+
+    result = runner.invoke(djlint, [tmp_file.name, "--check"], env=env)
+    assert result.exit_code == 1
+
+    result = runner.invoke(djlint, [tmp_file.name, "--check"], env=env)
+    assert result.exit_code == 1
+    assert "1 file would be updated." in result.output
+
+    result = runner.invoke(djlint, [tmp_file.name, "--reformat"], env=env)
+    assert result.exit_code == 1
+    assert (
+        Path(tmp_file.name).read_text(encoding="utf8")
+        == """<div>
+    <p>nice stuff here</p>
+</div>
+"""
+    )
+
+    result = runner.invoke(djlint, [tmp_file.name, "--check"], env=env)
+    assert result.exit_code == 0
+
+    result = runner.invoke(djlint, [tmp_file.name, "--check"], env=env)
+    assert result.exit_code == 0
+
+    result = runner.invoke(djlint, [tmp_file.name, "--check", "--no-cache"], env=env)
+    assert result.exit_code == 0
+    assert len(list(tmp_path.glob("*/*"))) == 2
+
+
+def test_rules_cache(runner: CliRunner, tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    env = {"DJLINT_CACHE_DIR": str(cache_dir)}
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "pyproject.toml").write_text("[tool]", encoding="utf8")
+    (project / "html.html").write_text("This is trichotillomania.", encoding="utf8")
+    rules = project / ".djlint_rules.yaml"
+    rules.write_text(
+        """- rule:
+    name: T001
+    message: Find Trichotillomania
+    flags: re.DOTALL|re.I
+    patterns:
+    - Trichotillomania
+""",
+        encoding="utf8",
+    )
+
+    result = runner.invoke(
+        djlint, [str(project), "--lint", "--profile", "django"], env=env
+    )
+    assert result.exit_code == 1
+    assert "T001 1:" in result.output
+
+    # the bundled rules and the custom rules are cached
+    assert len(list(cache_dir.glob("rules-*.json"))) == 2
+
+    # changing the rules misses the cache
+    rules.write_text(
+        """- rule:
+    name: T002
+    message: Find Trichotillomania, again
+    flags: re.DOTALL|re.I
+    patterns:
+    - Trichotillomania
+""",
+        encoding="utf8",
+    )
+
+    result = runner.invoke(
+        djlint, [str(project), "--lint", "--profile", "django"], env=env
+    )
+    assert result.exit_code == 1
+    assert "T001 1:" not in result.output
+    assert "T002 1:" in result.output
+
+
+def test_dependency_versions(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    config = Config(str(tmp_path))
+    fingerprint = djlint_cache.config_fingerprint(config)
+
+    # upgrading a formatting dependency misses the cache
+    monkeypatch.setattr(
+        djlint_cache.metadata, "version", lambda dependency: f"{dependency}-new"
+    )
+    djlint_cache.code_fingerprint.cache_clear()
+    upgraded = djlint_cache.config_fingerprint(config)
+
+    monkeypatch.undo()
+    djlint_cache.code_fingerprint.cache_clear()
+    assert upgraded != fingerprint
+    assert djlint_cache.config_fingerprint(config) == fingerprint
+
+
+def test_prune_least_recently_used(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    cache = djlint_cache.Cache(Config(str(tmp_path)))
+    written: Set[Path] = set()
+    for modified, name in enumerate(("one", "two", "three"), start=1):
+        cache.store("lint", Path(name), name, {"errors": []})
+        (entry,) = set(cache.directory.glob("*/*")) - written
+        written.add(entry)
+        os.utime(entry, (modified, modified))
+
+    # "one" was written first, but is the most recently used
+    assert cache.get("lint", Path("one"), "one") == {"errors": []}
+
+    size = next(cache.directory.glob("*/*")).stat().st_size
+    monkeypatch.setattr(djlint_cache, "MAX_CACHE_SIZE", size)
+    cache.prune()
+
+    assert cache.get("lint", Path("one"), "one") == {"errors": []}
+    assert cache.get("lint", Path("two"), "two") is None
+    assert cache.get("lint", Path("three"), "three") is None
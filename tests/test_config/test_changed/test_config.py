@@ -0,0 +1,74 @@
+"""Djlint tests specific to checking files changed in git.
+
+run::
+
+   pytest tests/test_config/test_changed/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_changed/test_config.py::test_changed --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+from click import ClickException
+
+from src.djlint.settings import Config
+from src.djlint.src import get_src
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_changed(tmp_path: Path) -> None:
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=djlint", "-c", "user.email=djlint@example.com"]
+            + list(args),
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+        )
+
+    def found(**options: Any) -> List[str]:
+        return sorted(
+            x.relative_to(tmp_path).as_posix()
+            for x in get_src([tmp_path], Config(str(tmp_path), **options))
+        )
+
+    git("init")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "templates").mkdir()
+    for name in [
+        "committed.html",
+        "node_modules/changed.html",
+        "templates/changed.html",
+        "templates/deleted.html",
+    ]:
+        (tmp_path / name).write_text("<div></div>", encoding="utf8")
+    git("add", ".")
+    git("commit", "-m", "first")
+
+    (tmp_path / "node_modules/changed.html").write_text("<p></p>", encoding="utf8")
+    (tmp_path / "templates/changed.html").write_text("<p></p>", encoding="utf8")
+    (tmp_path / "templates/changed.txt").write_text("<p></p>", encoding="utf8")
+    (tmp_path / "staged.html").write_text("<p></p>", encoding="utf8")
+    (tmp_path / "untracked.html").write_text("<p></p>", encoding="utf8")
+    git("add", "staged.html", "templates/changed.txt")
+    git("rm", "templates/deleted.html")
+
+    assert found(staged=True) == ["staged.html"]
+    assert found(changed_since="HEAD") == ["staged.html", "templates/changed.html"]
+
+    # only changed files given as src are checked
+    config = Config(str(tmp_path), staged=True)
+    assert not get_src([tmp_path / "committed.html"], config)
+    assert get_src([tmp_path / "staged.html"], config) == [tmp_path / "staged.html"]
+
+    with pytest.raises(ClickException, match="Could not get changed files"):
+        found(changed_since="not-a-revision")
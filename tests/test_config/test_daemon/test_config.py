@@ -0,0 +1,141 @@
+"""Djlint tests specific to the daemon.
+
+run::
+
+   pytest tests/test_config/test_daemon/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_daemon/test_config.py::test_daemon --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+import sys
+import threading
+from pathlib import Path
+
+import click
+import pytest
+
+# the daemon server cannot be imported without unix sockets.
+if sys.platform == "win32":
+    pytest.skip("the daemon needs unix sockets", allow_module_level=True)
+
+# pylint: disable=C0413
+from src import djlint_client  # noqa: E402
+from src.djlint import main as djlint  # noqa: E402
+from src.djlint.daemon import Configs, Server, handle_request, serve  # noqa: E402
+
+
+def test_handle_request(tmp_path: Path) -> None:
+    (tmp_path / "one.html").write_text("<div></span>", encoding="utf8")
+    configs = Configs()
+
+    response = handle_request(
+        {"args": ["one.html", "--lint"], "cwd": str(tmp_path)}, configs, djlint
+    )
+    assert response["exit_code"] == 1
+    assert "H025 1:0 Tag seems to be an orphan. <div>" in response["stdout"]
+    assert "Linted 1 file, found 2 errors." in response["stdout"]
+
+    # the config is loaded once and reused
+    response = handle_request(
+        {"args": ["one.html", "--lint"], "cwd": str(tmp_path)}, configs, djlint
+    )
+    assert response["exit_code"] == 1
+    assert len(configs.configs) == 1
+
+    # as it is for other files in the project
+    (tmp_path / "two.html").write_text("<div>x</div>", encoding="utf8")
+    response = handle_request(
+        {"args": ["two.html", "--lint"], "cwd": str(tmp_path)}, configs, djlint
+    )
+    assert response["exit_code"] == 0
+    assert len(configs.configs) == 1
+
+    # changing the settings loads a new config
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.djlint]\nignore='H025'", encoding="utf8"
+    )
+    response = handle_request(
+        {"args": ["one.html", "--lint"], "cwd": str(tmp_path)}, configs, djlint
+    )
+    assert response["exit_code"] == 0
+    assert len(configs.configs) == 2
+
+    response = handle_request(
+        {
+            "args": ["-", "--reformat"],
+            "cwd": str(tmp_path),
+            "stdin": "<div><p>x</p></div>",
+        },
+        configs,
+        djlint,
+    )
+    assert response["exit_code"] == 0
+    assert response["stdout"] == "<div>\n    <p>x</p>\n</div>\n"
+
+    response = handle_request(
+        {"args": ["--bad"], "cwd": str(tmp_path)}, configs, djlint
+    )
+    assert response["exit_code"] == 2
+    assert "No such option: --bad" in response["stderr"]
+
+    response = handle_request(
+        {"args": ["one.html", "--daemon"], "cwd": str(tmp_path)}, configs, djlint
+    )
+    assert response["exit_code"] == 2
+    assert "The daemon is already running." in response["stderr"]
+
+
+def test_daemon(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    (tmp_path / "one.html").write_text("<div></span>", encoding="utf8")
+    socket = tmp_path / "djlint.sock"
+    monkeypatch.setenv("DJLINT_SOCKET", str(socket))
+    monkeypatch.chdir(tmp_path)
+
+    with Server(socket, djlint) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        try:
+            with pytest.raises(SystemExit) as error:
+                djlint_client.main(["one.html", "--lint"])
+        finally:
+            server.shutdown()
+            thread.join()
+
+    assert error.value.code == 1
+    assert "H025 1:0 Tag seems to be an orphan. <div>" in capsys.readouterr().out
+
+    # without a daemon, djLint is run directly
+    assert djlint_client.send({"args": ["--version"]}) is None
+    with pytest.raises(SystemExit) as error:
+        djlint_client.main(["--version"])
+    assert error.value.code == 0
+    assert "djlint, version" in capsys.readouterr().out
+
+
+def test_private_folder(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    folder = tmp_path / "shared"
+    folder.mkdir(mode=0o755)
+    folder.chmod(0o755)
+    monkeypatch.setenv("DJLINT_SOCKET", str(folder / "djlint.sock"))
+
+    # a folder others can use is refused by the daemon, and not used by the client
+    with pytest.raises(click.UsageError, match="only you can use"):
+        serve(djlint, folder / "djlint.sock")
+    assert djlint_client.send({"args": ["--version"]}) is None
+
+    # as is a symlink to a private folder
+    private = tmp_path / "private"
+    private.mkdir(mode=0o700)
+    (tmp_path / "link").symlink_to(private)
+    assert djlint_client.is_private(private)
+    assert not djlint_client.is_private(tmp_path / "link")
+    with pytest.raises(click.UsageError, match="only you can use"):
+        serve(djlint, tmp_path / "link" / "djlint.sock")
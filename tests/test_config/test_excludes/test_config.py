@@ -14,9 +14,13 @@ for a single test, run::
 # pylint: disable=C0116
 
 
+from pathlib import Path
+
 from click.testing import CliRunner
 
 from src.djlint import main as djlint
+from src.djlint.settings import Config
+from src.djlint.src import walk
 
 
 def test_exclude(runner: CliRunner) -> None:
@@ -28,3 +32,40 @@ def test_exclude(runner: CliRunner) -> None:
     assert """excluded.html""" not in result.output
     assert """foo/excluded.html""" not in result.output
     assert result.exit_code == 1
+
+
+def test_walk(tmp_path: Path) -> None:
+    for folder in ["templates/keep", "node_modules/pkg", "var/keep"]:
+        (tmp_path / folder).mkdir(parents=True)
+        (tmp_path / folder / "a.html").write_text("", encoding="utf8")
+        (tmp_path / folder / "a.txt").write_text("", encoding="utf8")
+    (tmp_path / "pyproject.toml").write_text("[tool]", encoding="utf8")
+
+    def found(config: Config, threads: int = 2) -> list:
+        return sorted(
+            x.relative_to(tmp_path).as_posix() for x in walk(tmp_path, config, threads)
+        )
+
+    config = Config(str(tmp_path))
+    assert found(config) == ["templates/keep/a.html", "var/keep/a.html"]
+    assert found(config, 1) == found(config)
+
+    # gitignored folders are skipped, unless a file in them is added back
+    (tmp_path / ".gitignore").write_text("var/", encoding="utf8")
+    config = Config(str(tmp_path), use_gitignore=True)
+    assert found(config) == ["templates/keep/a.html"]
+
+    (tmp_path / ".gitignore").write_text("var/\n!a.html", encoding="utf8")
+    config = Config(str(tmp_path), use_gitignore=True)
+    assert found(config) == ["templates/keep/a.html", "var/keep/a.html"]
+
+    # a lookahead can see past the folder name
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.djlint]\nexclude='keep/(?!a.html)'", encoding="utf8"
+    )
+    config = Config(str(tmp_path))
+    assert found(config) == [
+        "node_modules/pkg/a.html",
+        "templates/keep/a.html",
+        "var/keep/a.html",
+    ]
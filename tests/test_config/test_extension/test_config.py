@@ -13,10 +13,12 @@ for a single test, run::
 """
 # pylint: disable=C0116
 
+from pathlib import Path
 
 from click.testing import CliRunner
 
 from src.djlint import main as djlint
+from src.djlint.settings import Config
 
 
 def test_extension(runner: CliRunner) -> None:
@@ -25,3 +27,22 @@ def test_extension(runner: CliRunner) -> None:
     assert """1/1""" in result.output
     assert """0 files would be updated.""" in result.output
     assert result.exit_code == 0
+
+
+def test_extensions(runner: CliRunner, tmp_path: Path) -> None:
+    for name in ["one.html", "two.jinja", "three.j2", "four.txt"]:
+        (tmp_path / name).write_text("<div></span>", encoding="utf8")
+
+    result = runner.invoke(djlint, [str(tmp_path), "--extension", "html, .jinja,j2"])
+    assert "Linted 3 files" in result.output
+
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.djlint]\nextension=["jinja", "txt"]', encoding="utf8"
+    )
+    result = runner.invoke(djlint, [str(tmp_path)])
+    assert "Linted 2 files" in result.output
+
+    # extension is kept for code written before extensions
+    config = Config(str(tmp_path))
+    assert config.extensions == ["jinja", "txt"]
+    assert config.extension == "jinja"
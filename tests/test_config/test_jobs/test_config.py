@@ -0,0 +1,59 @@
+"""Djlint tests specific to the number of worker processes.
+
+run::
+
+   pytest tests/test_config/test_jobs/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_jobs/test_config.py::test_jobs --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from src.djlint import build_chunks
+from src.djlint import main as djlint
+
+
+def test_jobs(runner: CliRunner, tmp_path: Path) -> None:
+    # large enough to be sent to worker processes
+    for name in ["one", "two", "three"]:
+        (tmp_path / f"{name}.html").write_text(
+            "<div>\n" + "<p>text</p>\n" * 3000 + "</span>\n", encoding="utf8"
+        )
+
+    for jobs in ["1", "2"]:
+        result = runner.invoke(
+            djlint, [str(tmp_path), "--lint", "--no-cache", "--jobs", jobs]
+        )
+        assert result.exit_code == 1
+        assert "Linted 3 files, found 6 errors." in result.output
+
+    result = runner.invoke(djlint, [str(tmp_path), "--lint", "--jobs", "0"])
+    assert result.exit_code == 2
+
+
+def test_jobs_config(runner: CliRunner, tmp_path: Path) -> None:
+    (tmp_path / "pyproject.toml").write_text("[tool.djlint]\njobs=2", encoding="utf8")
+    (tmp_path / "test.html").write_text("<div></span>", encoding="utf8")
+
+    result = runner.invoke(djlint, [str(tmp_path), "--lint", "--no-cache"])
+    assert result.exit_code == 1
+    assert "Linted 1 file, found 2 errors." in result.output
+
+
+def test_build_chunks() -> None:
+    files = [Path(f"{x}.html") for x in range(10)]
+
+    chunks = build_chunks(files, [100] * 10, 2)
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2, 2, 2]
+    assert [x for chunk in chunks for x in chunk] == files
+
+    # a large file closes the chunk it is added to
+    chunks = build_chunks(files, [10] * 8 + [1000, 10], 2)
+    assert [len(chunk) for chunk in chunks] == [9, 1]
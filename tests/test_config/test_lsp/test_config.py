@@ -0,0 +1,300 @@
+"""Djlint tests specific to the language server.
+
+run::
+
+   pytest tests/test_config/test_lsp/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_lsp/test_config.py::test_lsp --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+from click.testing import CliRunner
+
+from src.djlint import main as djlint
+from src.djlint.lint import lint_html
+from src.djlint.lsp import Configs, Document
+from src.djlint.settings import Config
+
+
+def encode(messages: List[Dict[str, Any]]) -> bytes:
+    output = b""
+    for message in messages:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf8")
+        output += b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+    return output
+
+
+def decode(output: bytes) -> List[Dict[str, Any]]:
+    messages = []
+    while output:
+        header, _, output = output.partition(b"\r\n\r\n")
+        length = int(header.split(b":")[1])
+        messages.append(json.loads(output[:length]))
+        output = output[length:]
+    return messages
+
+
+def test_lsp(runner: CliRunner, tmp_path: Path) -> None:
+    uri = (tmp_path / "test.html").as_uri()
+    change = {
+        "range": {
+            "start": {"line": 0, "character": 5},
+            "end": {"line": 0, "character": 12},
+        },
+        "text": "x</div>",
+    }
+
+    result = runner.invoke(
+        djlint,
+        ["--lsp"],
+        input=encode(
+            [
+                {"id": 1, "method": "initialize", "params": {}},
+                {"method": "initialized", "params": {}},
+                {
+                    "method": "textDocument/didOpen",
+                    "params": {
+                        "textDocument": {
+                            "uri": uri,
+                            "languageId": "html",
+                            "version": 1,
+                            "text": "<div></span>",
+                        }
+                    },
+                },
+                {
+                    "method": "textDocument/didChange",
+                    "params": {
+                        "textDocument": {"uri": uri, "version": 2},
+                        "contentChanges": [change],
+                    },
+                },
+                {"id": 2, "method": "textDocument/hover", "params": {}},
+                {
+                    "method": "textDocument/didClose",
+                    "params": {"textDocument": {"uri": uri}},
+                },
+                {"id": 3, "method": "shutdown"},
+                {"method": "exit"},
+            ]
+        ),
+    )
+    assert result.exit_code == 0
+
+    messages = decode(result.stdout_bytes)
+    assert messages[0]["id"] == 1
+    assert messages[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+
+    assert messages[1]["params"]["uri"] == uri
+    assert sorted(
+        (
+            (x["code"], x["range"]["start"], x["message"])
+            for x in messages[1]["params"]["diagnostics"]
+        ),
+        key=lambda x: x[1]["character"],
+    ) == [
+        ("H025", {"line": 0, "character": 0}, "Tag seems to be an orphan."),
+        ("H025", {"line": 0, "character": 5}, "Tag seems to be an orphan."),
+    ]
+
+    # fixed by the change
+    assert messages[2]["params"]["diagnostics"] == []
+
+    assert messages[3]["id"] == 2
+    assert messages[3]["error"]["code"] == -32601
+
+    # errors are cleared when the document is closed
+    assert messages[4]["params"]["diagnostics"] == []
+    assert messages[5] == {"jsonrpc": "2.0", "id": 3, "result": None}
+
+
+def test_incremental(tmp_path: Path) -> None:
+    path = tmp_path / "test.html"
+    config = Configs().get(path)
+    block = """<div class="a">
+    <img src="a.png">
+    <p style="color:red">text</p>
+</div>
+"""
+    document = Document(path, block * 40, config)
+
+    def position(line: int, character: int) -> Dict[str, int]:
+        return {"line": line, "character": character}
+
+    edits: List[List[Dict[str, Any]]] = [
+        # fix an error
+        [
+            {
+                "range": {"start": position(41, 13), "end": position(41, 13)},
+                "text": ' alt="a"',
+            }
+        ],
+        # add an orphan tag and an error
+        [
+            {
+                "range": {"start": position(80, 0), "end": position(80, 0)},
+                "text": "<span style=x>\n",
+            }
+        ],
+        # ignore a block that is closed later
+        [
+            {
+                "range": {"start": position(20, 0), "end": position(20, 0)},
+                "text": "<!-- djlint:off -->\n",
+            }
+        ],
+        [
+            {
+                "range": {"start": position(150, 0), "end": position(150, 0)},
+                "text": "<!-- djlint:on -->\n",
+            }
+        ],
+        # then remove the start of the block
+        [{"range": {"start": position(20, 0), "end": position(21, 0)}, "text": ""}],
+        # several changes, with characters that are two utf-16 units
+        [
+            {"range": {"start": position(5, 4), "end": position(7, 4)}, "text": "😀😀"},
+            {
+                "range": {"start": position(5, 8), "end": position(5, 8)},
+                "text": "<img>",
+            },
+        ],
+        # replace all of the text
+        [{"text": "<div></div>"}],
+    ]
+
+    for changes in edits:
+        document.change(changes)
+        assert sorted(document.errors) == sorted(lint_html(config, document.text, path))
+
+    assert document.text == "<div></div>"
+
+
+def test_require_pragma(tmp_path: Path) -> None:
+    path = tmp_path / "test.html"
+    config = Config(str(tmp_path), require_pragma=True)
+
+    def position(line: int, character: int) -> Dict[str, int]:
+        return {"line": line, "character": character}
+
+    # as with files, text without a pragma is not checked
+    document = Document(path, "<div></span>", config)
+    assert not document.errors
+
+    document.change(
+        [
+            {
+                "range": {"start": position(0, 0), "end": position(0, 0)},
+                "text": "<!-- djlint:on -->\n",
+            }
+        ]
+    )
+    assert len(document.errors) == 2
+    assert sorted(document.errors) == sorted(lint_html(config, document.text, path))
+
+    document.change(
+        [{"range": {"start": position(0, 0), "end": position(1, 0)}, "text": ""}]
+    )
+    assert not document.errors
+
+
+def test_small_edits(tmp_path: Path) -> None:
+    path = tmp_path / "test.html"
+    config = Configs().get(path)
+
+    def position(document: Document, offset: int) -> Dict[str, int]:
+        line, col = document.lines.position(offset)
+        return {"line": line - 1, "character": col}
+
+    # a match can start where a change ends, and depend on the text before it.
+    document = Document(path, "\n<html>", config)
+    document.change(
+        [
+            {
+                "range": {"start": position(document, 0), "end": position(document, 1)},
+                "text": "",
+            }
+        ]
+    )
+    assert sorted(document.errors) == sorted(lint_html(config, document.text, path))
+
+    # a change can add a match that starts before the last match.
+    document = Document(path, "<p><p>{% endblock %}", config)
+    for start, end in [(17, 18), (6, 9)]:
+        document.change(
+            [
+                {
+                    "range": {
+                        "start": position(document, start),
+                        "end": position(document, end),
+                    },
+                    "text": "",
+                }
+            ]
+        )
+        assert sorted(document.errors) == sorted(lint_html(config, document.text, path))
+
+
+def test_random_edits(tmp_path: Path) -> None:
+    path = tmp_path / "test.html"
+    config = Configs().get(path)
+    pieces = [
+        "<html>",
+        "<div>",
+        "</div>",
+        "<p>",
+        "</span>",
+        '<img src="a.png">',
+        "<a href=x>",
+        '<p style="color:red">',
+        "{% endblock %}",
+        "{% if a %}",
+        "{{ b }}",
+        "<!-- djlint:off -->",
+        "<!-- djlint:on -->",
+        "<script>",
+        "</script>",
+        "<DIV>",
+        "text",
+        " ",
+        "\n",
+    ]
+    generator = random.Random(0)
+
+    def position(document: Document, offset: int) -> Dict[str, int]:
+        line, col = document.lines.position(offset)
+        return {"line": line - 1, "character": col}
+
+    for _ in range(40):
+        document = Document(
+            path,
+            "".join(generator.choice(pieces) for _ in range(generator.randint(1, 20))),
+            config,
+        )
+
+        for _ in range(10):
+            start = generator.randint(0, len(document.text))
+            end = min(len(document.text), start + generator.randint(0, 6))
+            document.change(
+                [
+                    {
+                        "range": {
+                            "start": position(document, start),
+                            "end": position(document, end),
+                        },
+                        "text": generator.choice(["", "", generator.choice(pieces)]),
+                    }
+                ]
+            )
+            assert sorted(document.errors) == sorted(
+                lint_html(config, document.text, path)
+            ), document.text
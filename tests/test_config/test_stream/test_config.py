@@ -0,0 +1,61 @@
+"""Djlint tests specific to streamed output.
+
+run::
+
+   pytest tests/test_config/test_stream/test_config.py --cov=src/djlint --cov-branch \
+          --cov-report xml:coverage.xml --cov-report term-missing
+
+for a single test, run::
+
+   pytest tests/test_config/test_stream/test_config.py::test_stream --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+# pylint: disable=C0116
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from src.djlint import main as djlint
+
+
+def test_stream(runner: CliRunner) -> None:
+    with runner.isolated_filesystem():
+        Path("one.html").write_text("<div></span>", encoding="utf8")
+        Path("two.html").write_text("<div><p>text</p></div>", encoding="utf8")
+
+        result = runner.invoke(
+            djlint, ["one.html", "two.html", "--lint", "--check", "--stream"]
+        )
+
+    assert result.exit_code == 1
+    assert "Linting" not in result.output
+    assert "H025 1:0 Tag seems to be an orphan. <div>" in result.output
+    assert "+    <p>text</p>" in result.output
+    assert "2 files would be updated." in result.output
+    assert "Linted 2 files, found 2 errors." in result.output
+
+
+def test_stream_in_order(runner: CliRunner) -> None:
+    with runner.isolated_filesystem():
+        Path("pyproject.toml").write_text(
+            '[tool.djlint]\nlinter_output_format="{filename} {code}"', encoding="utf8"
+        )
+
+        # the last file is the largest, so it is started first
+        for name, lines in [("a", 1), ("b", 1000), ("c", 2000), ("d", 3000)]:
+            Path(f"{name}.html").write_text(
+                "<div>\n" + "<p>text</p>\n" * lines, encoding="utf8"
+            )
+
+        result = runner.invoke(
+            djlint, [".", "--lint", "--stream-in-order", "--jobs", "2", "--no-cache"]
+        )
+
+    assert result.exit_code == 1
+    assert [line for line in result.output.splitlines() if "H025" in line] == [
+        "a.html H025",
+        "b.html H025",
+        "c.html H025",
+        "d.html H025",
+    ]
@@ -69,6 +69,17 @@ def test_blocktranslate(runner: CliRunner, tmp_file: TextIO) -> None:
     )
     assert output.exit_code == 0
 
+    # spaces inside the tags
+    output = reformat(
+        tmp_file,
+        runner,
+        b"""<p>
+    {%  blocktrans  %}If you have not created an account yet, then please
+    <a href="{{ signup_url }}">sign up</a> first.{%  endblocktrans  %}
+</p>\n""",
+    )
+    assert output.exit_code == 0
+
 
 # def test_trans(runner: CliRunner, tmp_file: TextIO) -> None:
 #     output = reformat(
@@ -38,3 +38,21 @@ def test_if(runner: CliRunner, tmp_file: TextIO) -> None:
 {% endif %}
 """
     )
+
+
+def test_if_in_attributes(runner: CliRunner, tmp_file: TextIO) -> None:
+    output = reformat(
+        tmp_file,
+        runner,
+        b"""<div class="{% if a %}b{% endif %}" {% if c %}data-x='{"d": 1}'{% endif %}>{% if d %}<p title="x > y" {% if e %}hidden{% endif %}>x</p>{% endif %}</div>""",
+    )
+    assert output.exit_code == 1
+    assert (
+        output.text
+        == r"""<div class="{% if a %}b{% endif %}" {% if c %}data-x='{"d": 1}'{% endif %}>
+    {% if d %}
+        <p title="x > y" {% if e %}hidden{% endif %}>x</p>
+    {% endif %}
+</div>
+"""
+    )
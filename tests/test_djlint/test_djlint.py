@@ -123,6 +123,19 @@ def test_stdin(runner: CliRunner) -> None:
     result = runner.invoke(djlint, ["-", "--check"], input="<div></div>")
     assert result.output == "<div></div>\n"
 
+    # the reformatted code is linted
+    result = runner.invoke(
+        djlint, ["-", "--reformat", "--lint"], input="<div><p></p></span>"
+    )
+    assert result.exit_code == 1
+    assert "<div>\n    <p></p>\n</span>\n" in result.output
+    assert "H025 3:0 Tag seems to be an orphan. </span>" in result.output
+
+    # check with require pragma
+    result = runner.invoke(djlint, ["-", "--require-pragma"], input="<div></span>")
+    assert result.exit_code == 0
+    assert "No files to check!" in result.output
+
 
 def test_stdin_non_ascii(runner: CliRunner) -> None:
     result = runner.invoke(djlint, ["-", "--reformat"], input="必須")
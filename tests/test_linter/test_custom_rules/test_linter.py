@@ -26,4 +26,6 @@ def test_custom_rules(runner: CliRunner) -> None:
     assert """Linting""" in result.output
     assert """1/1""" in result.output
     assert """T001 1:""" in result.output
+    assert """T002 1:""" not in result.output
+    assert """T003 1:""" in result.output
     assert result.exit_code == 1
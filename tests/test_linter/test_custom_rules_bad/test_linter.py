@@ -26,4 +26,6 @@ def test_custom_rules_bad_config(runner: CliRunner) -> None:
     assert """Linting""" in result.output
     assert """1/1""" in result.output
     assert """T001 1:""" in result.output
+    assert """Rule T005 requires should be a list!""" in result.output
+    assert """T005 1:""" not in result.output
     assert result.exit_code == 1
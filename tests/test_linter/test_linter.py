@@ -610,6 +610,13 @@ def test_H025(runner: CliRunner, tmp_file: TextIO) -> None:
     result = runner.invoke(djlint, [tmp_file.name])
     assert "H025" not in result.output
 
+    write_to_file(tmp_file.name, b"<div><p>\n</div></p>\n<span></div>")
+    result = runner.invoke(djlint, [tmp_file.name])
+    assert "H025 1:0" not in result.output
+    assert "H025 1:5" not in result.output
+    assert "H025 3:0" in result.output
+    assert "H025 3:6" in result.output
+
     write_to_file(
         tmp_file.name,
         b'<script src="{% static \'notifications/notify.js\' %}" type="text/javascript"></script>',
@@ -971,6 +978,18 @@ H025 2:12 Tag seems to be an orphan. </h4>"""
     )
 
 
+def test_output_line_numbers(runner: CliRunner, tmp_file: TextIO) -> None:
+    write_to_file(tmp_file.name, b"<p>\r\n\n  </span>\n")
+    result = runner.invoke(djlint, [tmp_file.name])
+    assert result.exit_code == 1
+
+    assert (
+        """H025 1:0 Tag seems to be an orphan. <p>
+H025 3:2 Tag seems to be an orphan. </span>"""
+        in result.output
+    )
+
+
 def test_ignoring_rules(runner: CliRunner, tmp_file: TextIO) -> None:
     write_to_file(
         tmp_file.name,